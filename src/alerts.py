@@ -0,0 +1,260 @@
+import argparse
+import json
+import threading
+import urllib.request
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+from database import FlightDatabase
+
+WatchRule = namedtuple('WatchRule', [
+    'id', 'origin', 'destination', 'date_from', 'date_to', 'max_price_cents', 'drop_percent'
+])
+
+
+def stdout_sink(event):
+    """Print an alert event"""
+    price = event["price_cents"] / 100
+    if event["kind"] == "below_threshold":
+        reason = f"below {event['threshold_cents'] / 100:.2f}"
+    else:
+        reason = f"down {event['drop_percent']:.0f}% from {event['previous_cents'] / 100:.2f}"
+    print(f"🔔 {event['origin']} → {event['destination']} on {event['departure_date'] or 'any date'}: "
+          f"{price:.2f} ({reason}, rule {event['rule_id']})")
+
+
+class JsonlSink:
+    """Append alert events to a JSON Lines file"""
+
+    def __init__(self, path='data/alerts.jsonl'):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event) + "\n")
+
+
+class WebhookSink:
+    """POST alert events as JSON to a URL; with dry_run it only prints the request"""
+
+    def __init__(self, url, timeout=5, dry_run=False):
+        self.url = url
+        self.timeout = timeout
+        self.dry_run = dry_run
+
+    def __call__(self, event):
+        body = json.dumps(event).encode('utf-8')
+        if self.dry_run:
+            print(f"🌐 Would POST {len(body)} bytes to {self.url}")
+            return
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        try:
+            urllib.request.urlopen(request, timeout=self.timeout).close()
+        except OSError as e:
+            print(f"⚠️ Webhook {self.url} failed: {e}")
+
+
+class AlertEngine:
+    """Evaluate price watch rules incrementally as searches are saved
+
+    Rules are indexed in memory by route, so a save only looks at the rules
+    for its own route. Each rule is compared with the search's lowest price
+    and the last-known minimum for that route and departure date, which is
+    cached in memory and persisted in route_min_prices (one primary-key
+    lookup per search, never a scan of the flights table). Rules are
+    reloaded whenever another connection has written to the database, so
+    rules added with `alerts.py add` apply to a long-running process.
+    """
+
+    def __init__(self, db, sinks=None):
+        self.db = db
+        self.sinks = sinks if sinks is not None else [stdout_sink]
+        self.rules = {}
+        self._last_min = {}
+        self._lock = threading.Lock()
+        self._data_version = None
+        self.load_rules()
+        db.add_listener(self.on_saved)
+
+    @staticmethod
+    def _route(origin, destination):
+        return origin.strip().upper(), destination.strip().upper()
+
+    def _data_changed(self):
+        """Whether another connection has committed since the rules were loaded"""
+        with self.db.lock:
+            version = self.db.conn.execute("PRAGMA data_version").fetchone()[0]
+        changed = version != self._data_version
+        self._data_version = version
+        return changed
+
+    def load_rules(self):
+        self._data_changed()
+        with self.db.lock:
+            rows = self.db.conn.execute('''
+                SELECT id, origin, destination, date_from, date_to, max_price_cents, drop_percent
+                FROM watch_rules WHERE active = 1
+            ''').fetchall()
+        with self._lock:
+            self.rules = {}
+            for row in rows:
+                rule = WatchRule(*row)
+                self.rules.setdefault(self._route(rule.origin, rule.destination), []).append(rule)
+
+    def add_rule(self, origin, destination, date_from=None, date_to=None, max_price=None, drop_percent=None):
+        """Watch a route for a price at or below max_price, or a drop of drop_percent; returns the rule"""
+        if max_price is None and drop_percent is None:
+            raise ValueError("A watch rule needs max_price and/or drop_percent")
+        origin, destination = self._route(origin, destination)
+        max_price_cents = None if max_price is None else round(max_price * 100)
+        with self.db.lock:
+            cursor = self.db.conn.execute('''
+                INSERT INTO watch_rules (origin, destination, date_from, date_to, max_price_cents, drop_percent)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (origin, destination, date_from, date_to, max_price_cents, drop_percent))
+            self.db.conn.commit()
+        rule = WatchRule(cursor.lastrowid, origin, destination, date_from, date_to, max_price_cents, drop_percent)
+        with self._lock:
+            self.rules.setdefault((origin, destination), []).append(rule)
+        return rule
+
+    def remove_rule(self, rule_id):
+        with self.db.lock:
+            self.db.conn.execute("UPDATE watch_rules SET active = 0 WHERE id = ?", (rule_id,))
+            self.db.conn.commit()
+        with self._lock:
+            for route, rules in self.rules.items():
+                self.rules[route] = [rule for rule in rules if rule.id != rule_id]
+
+    def _previous_min(self, key):
+        if key not in self._last_min:
+            with self.db.lock:
+                row = self.db.conn.execute('''
+                    SELECT min_price_cents FROM route_min_prices
+                    WHERE origin = ? AND destination = ? AND departure_date = ?
+                ''', key).fetchone()
+            self._last_min[key] = row[0] if row else None
+        return self._last_min[key]
+
+    def _store_min(self, key, price_cents):
+        self._last_min[key] = price_cents
+        with self.db.lock:
+            self.db.conn.execute('''
+                INSERT INTO route_min_prices (origin, destination, departure_date, min_price_cents)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (origin, destination, departure_date) DO UPDATE SET
+                    min_price_cents = excluded.min_price_cents,
+                    updated_at = CURRENT_TIMESTAMP
+            ''', (*key, price_cents))
+            self.db.conn.commit()
+
+    @staticmethod
+    def _matches_date(rule, departure_date):
+        if departure_date is None:
+            return rule.date_from is None and rule.date_to is None
+        departure_date = str(departure_date)
+        return ((rule.date_from is None or departure_date >= rule.date_from)
+                and (rule.date_to is None or departure_date <= rule.date_to))
+
+    def evaluate(self, origin, destination, departure_date, price_cents, search_id=None):
+        """Check one route's new lowest price against its rules and return the alert events"""
+        route = self._route(origin, destination)
+        key = (*route, str(departure_date or ''))
+        with self._lock:
+            previous = self._previous_min(key)
+            self._store_min(key, price_cents)
+            rules = [rule for rule in self.rules.get(route, []) if self._matches_date(rule, departure_date)]
+
+        events = []
+        for rule in rules:
+            base = {
+                "rule_id": rule.id,
+                "origin": route[0],
+                "destination": route[1],
+                "departure_date": departure_date,
+                "price_cents": price_cents,
+                "previous_cents": previous,
+                "search_id": search_id,
+                "at": datetime.now().isoformat(timespec='seconds')
+            }
+            # Only fire when the price crosses the threshold, not on every save below it
+            threshold = rule.max_price_cents
+            if threshold is not None and price_cents <= threshold and (previous is None or previous > threshold):
+                events.append(dict(base, kind="below_threshold", threshold_cents=threshold))
+            if (rule.drop_percent is not None and previous
+                    and price_cents <= previous * (1 - rule.drop_percent / 100)):
+                events.append(dict(base, kind="price_drop", drop_percent=100 * (previous - price_cents) / previous))
+        return events
+
+    def on_saved(self, searches):
+        """FlightDatabase listener: evaluate the rules affected by newly saved searches"""
+        if self._data_changed():
+            self.load_rules()
+        for search in searches:
+            prices = [flight.price_cents for flight in search["flights"] if flight.price_cents is not None]
+            if not prices:
+                continue
+            events = self.evaluate(search["origin"], search["destination"], search.get("departure_date"),
+                                   min(prices), search.get("search_id"))
+            for event in events:
+                self.emit(event)
+
+    def emit(self, event):
+        for sink in self.sinks:
+            try:
+                sink(event)
+            except Exception as e:
+                print(f"⚠️ Alert sink failed: {e}")
+
+
+def add_alert_arguments(parser):
+    """Options for the commands that save searches and can evaluate watch rules as they do"""
+    parser.add_argument("--alerts", action="store_true", help="Evaluate price watch rules on every save")
+    parser.add_argument("--alerts-jsonl", help="Also append alert events to this JSON Lines file")
+    parser.add_argument("--alerts-webhook", help="Also POST alert events to this URL")
+
+
+def attach_alerts(db, args):
+    """An AlertEngine listening on db if any alert option was given, else None"""
+    if db is None or not (args.alerts or args.alerts_jsonl or args.alerts_webhook):
+        return None
+    sinks = [stdout_sink]
+    if args.alerts_jsonl:
+        sinks.append(JsonlSink(args.alerts_jsonl))
+    if args.alerts_webhook:
+        sinks.append(WebhookSink(args.alerts_webhook))
+    engine = AlertEngine(db, sinks)
+    print(f"🔔 Watching {sum(map(len, engine.rules.values()))} price rules")
+    return engine
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage price watch rules")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add = subparsers.add_parser("add", help="Add a watch rule")
+    add.add_argument("origin")
+    add.add_argument("destination")
+    add.add_argument("--from", dest="date_from", help="First departure date (YYYY-MM-DD)")
+    add.add_argument("--to", dest="date_to", help="Last departure date (YYYY-MM-DD)")
+    add.add_argument("--max-price", type=float, help="Alert when the price reaches this amount")
+    add.add_argument("--drop", type=float, help="Alert when the price drops by this percentage")
+    subparsers.add_parser("list", help="List active watch rules")
+    remove = subparsers.add_parser("remove", help="Deactivate a watch rule")
+    remove.add_argument("rule_id", type=int)
+    args = parser.parse_args()
+
+    engine = AlertEngine(FlightDatabase())
+    if args.command == "add":
+        rule = engine.add_rule(args.origin, args.destination, args.date_from, args.date_to,
+                               args.max_price, args.drop)
+        print(f"✅ Added rule {rule.id}")
+    elif args.command == "remove":
+        engine.remove_rule(args.rule_id)
+        print(f"✅ Removed rule {args.rule_id}")
+    else:
+        for rules in engine.rules.values():
+            for rule in rules:
+                print(rule)
@@ -0,0 +1,143 @@
+import argparse
+import shutil
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+
+# Every saved flight with its search, in insertion order
+FLIGHTS_QUERY = '''
+    SELECT fs.id AS search_id, fs.search_date, fs.origin, fs.destination,
+           fs.departure_date, fs.return_date,
+           f.price_cents, f.currency, f.airline, f.departure_time, f.arrival_time,
+           f.arrival_day_offset, f.duration_minutes, f.stops
+    FROM flights f
+    JOIN flight_searches fs ON fs.id = f.search_id
+    {where}
+    ORDER BY f.id
+'''
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def _prepare(frame):
+    """Add the derived columns used for partitioning and analysis"""
+    frame["price"] = frame["price_cents"] / 100
+    frame["route"] = frame["origin"] + "-" + frame["destination"]
+    frame["month"] = frame["search_date"].dt.strftime("%Y-%m")
+    frame["departure_date"] = pd.to_datetime(frame["departure_date"], errors="coerce")
+    return frame
+
+
+def iter_flight_frames(db, chunksize=50000, origin=None, destination=None, since=None):
+    """Stream saved flights as DataFrames of at most chunksize rows
+
+    db is a FlightDatabase or a database path. Reads go through their own
+    connection, so they don't hold up writers (the database runs in WAL mode).
+    """
+    db_path = getattr(db, "db_path", db)
+    conditions, params = [], []
+    for column, value in (("fs.origin", origin), ("fs.destination", destination)):
+        if value:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    if since:
+        conditions.append("fs.search_date >= ?")
+        params.append(str(since))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    with closing(sqlite3.connect(db_path)) as conn:
+        for frame in pd.read_sql_query(FLIGHTS_QUERY.format(where=where), conn, params=params,
+                                       chunksize=chunksize, parse_dates=["search_date"]):
+            yield _prepare(frame)
+
+
+def load_flights(db, **filters):
+    """Load saved flights into one DataFrame"""
+    frames = list(iter_flight_frames(db, **filters))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def export_parquet(db, directory="data/analytics", chunksize=50000, **filters):
+    """Write saved flights to a Parquet dataset partitioned by route and month; returns the row count
+
+    Every partition this run writes to is replaced, so re-running an export
+    does not duplicate rows; partitions outside the filters are left alone.
+    """
+    rows = 0
+    replaced = set()
+    for frame in iter_flight_frames(db, chunksize=chunksize, **filters):
+        # Clear old files the first time this run touches a partition (hive layout, URI-escaped values)
+        for route, month in frame[["route", "month"]].drop_duplicates().itertuples(index=False):
+            if (route, month) not in replaced:
+                shutil.rmtree(Path(directory) / f"route={quote(route, safe='')}" / f"month={quote(month, safe='')}",
+                              ignore_errors=True)
+                replaced.add((route, month))
+        frame.to_parquet(directory, engine="pyarrow", partition_cols=["route", "month"], index=False)
+        rows += len(frame)
+    print(f"📦 Exported {rows} flights to {directory}")
+    return rows
+
+
+def daily_min_prices(flights):
+    """Lowest observed price per search day (rows) and route (columns), one row per calendar day"""
+    priced = flights.dropna(subset=["price"])
+    day = priced["search_date"].dt.normalize().rename("day")
+    daily = priced.groupby([day, "route"])["price"].min().unstack("route")
+    return daily.asfreq("D")
+
+
+def rolling_min(flights, window=7):
+    """Rolling minimum of the daily lowest price over the last window days"""
+    return daily_min_prices(flights).rolling(f"{window}D", min_periods=1).min()
+
+
+def volatility(flights, window=7):
+    """Rolling standard deviation of day-over-day changes in the daily lowest price"""
+    daily = daily_min_prices(flights)
+    changes = daily / daily.shift(1) - 1  # Days without data stay NaN instead of being filled
+    return changes.rolling(f"{window}D", min_periods=2).std()
+
+
+def day_of_week_effect(flights):
+    """Average price by departure weekday relative to each route's overall average (1.0 = average)"""
+    priced = flights.dropna(subset=["price", "departure_date"])
+    weekday = priced["departure_date"].dt.day_name().rename("weekday")
+    means = priced.groupby(["route", weekday])["price"].mean().unstack("weekday")
+    means = means.reindex(columns=[day for day in WEEKDAYS if day in means.columns])
+    return means.div(priced.groupby("route")["price"].mean(), axis=0)
+
+
+def print_report(flights, window=7):
+    if flights.empty:
+        print("⚠️ No flights saved yet")
+        return
+    print(f"📊 {len(flights)} flights on {flights['route'].nunique()} routes")
+    print(f"\n📉 {window}-day rolling minimum:")
+    print(rolling_min(flights, window).dropna(how="all").tail(window).round(2).to_string())
+    print(f"\n〰️ {window}-day volatility of daily changes:")
+    print(volatility(flights, window).dropna(how="all").tail(window).round(3).to_string())
+    print("\n📅 Price by departure weekday (relative to route average):")
+    print(day_of_week_effect(flights).round(2).to_string())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyze saved price history")
+    parser.add_argument("command", choices=["report", "export"])
+    parser.add_argument("--db", default="data/flight_history.db")
+    parser.add_argument("--origin")
+    parser.add_argument("--destination")
+    parser.add_argument("--since", help="Only searches on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--window", type=int, default=7, help="Rolling window in days")
+    parser.add_argument("--out", default="data/analytics", help="Parquet dataset directory")
+    args = parser.parse_args()
+
+    filters = {"origin": args.origin, "destination": args.destination, "since": args.since}
+    if args.command == "export":
+        export_parquet(args.db, args.out, **filters)
+    else:
+        print_report(load_flights(args.db, **filters), args.window)
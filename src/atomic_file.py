@@ -0,0 +1,21 @@
+import os
+import tempfile
+from pathlib import Path
+
+
+def atomic_write(path, text):
+    """Replace path with text so readers see either the old file or the new one, never a partial write
+
+    Each call writes its own temp file next to path, so overlapping writes
+    from several threads or processes never rename each other's file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=path.parent,
+                                     prefix=path.stem, suffix='.tmp', delete=False) as tmp:
+        tmp.write(text)
+    try:
+        os.replace(tmp.name, path)
+    except OSError:
+        os.unlink(tmp.name)
+        raise
@@ -0,0 +1,208 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from collections import namedtuple
+import argparse
+import csv
+import multiprocessing.util
+import threading
+import time
+
+from flight_scraper import GoogleFlightsScraper
+from driver_pool import DriverPool
+from database import FlightDatabase
+from search_cache import cache_key, SearchCache, FileCacheStore
+from tracing import default_tracer
+from selector_registry import default_registry
+from alerts import add_alert_arguments, attach_alerts
+
+SEARCH_HOST = "www.google.com"
+
+# Seconds a search waits for a pooled driver before giving up, so leaked
+# drivers show up as failed searches rather than a hung batch
+ACQUIRE_TIMEOUT = 600
+
+SearchJob = namedtuple('SearchJob', ['origin', 'destination', 'departure_date', 'return_date'],
+                       defaults=[None])
+
+
+class RateLimiter:
+    """Keep at least min_interval seconds between requests to the same host"""
+
+    def __init__(self, min_interval=2.0):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def search_job(job, pool, lean=False):
+    """Run one search on a driver borrowed from pool"""
+    scraper = GoogleFlightsScraper(pool=pool, interactive=False, lean=lean, pool_timeout=ACQUIRE_TIMEOUT)
+    return scraper.search_flights(job.origin, job.destination, job.departure_date, job.return_date)
+
+
+# Each worker process owns one pooled driver, created by the initializer
+_process_pool = None
+_process_lean = False
+
+
+def _init_process(headless, max_uses, lean=False):
+    global _process_pool, _process_lean
+    _process_pool = DriverPool(size=1, headless=headless, max_uses=max_uses, lean=lean)
+    _process_lean = lean
+    # Quit the driver and keep the selector stats when the worker process shuts down
+    multiprocessing.util.Finalize(None, _process_pool.close, exitpriority=10)
+    multiprocessing.util.Finalize(None, default_registry.save, exitpriority=5)
+
+
+def _process_search(job):
+    return search_job(job, _process_pool, _process_lean)
+
+
+class BatchRunner:
+    """Run many route searches with bounded concurrency
+
+    Jobs are dispatched to ``workers`` threads (sharing a DriverPool with one
+    driver per worker) or processes (one driver each). Dispatch is spaced by
+    a per-host rate limiter and finished searches are written to the
+    database as they complete, from the calling thread only. With a
+    SearchCache, jobs with a fresh cached result are not scraped again.
+    With ``lean`` the browsers skip images, fonts, media and trackers.
+    """
+
+    def __init__(self, workers=4, db=None, use_processes=False, headless=True,
+                 min_interval=2.0, max_uses=25, cache=None, lean=False):
+        self.workers = workers
+        self.db = db if db is not None else FlightDatabase()
+        self.use_processes = use_processes
+        self.headless = headless
+        self.max_uses = max_uses
+        self.rate_limiter = RateLimiter(min_interval)
+        self.cache = cache
+        self.lean = lean
+        self.stats = {"submitted": 0, "cached": 0, "succeeded": 0, "failed": 0, "flights": 0, "bytes": 0}
+
+    def run(self, jobs):
+        """Search every job and return a list of (job, result) pairs"""
+        results = []
+        pool = None
+
+        if self.use_processes:
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_process,
+                initargs=(self.headless, self.max_uses, self.lean)
+            )
+            submit = lambda job: executor.submit(_process_search, job)
+        else:
+            pool = DriverPool(size=self.workers, headless=self.headless, max_uses=self.max_uses,
+                              lean=self.lean)
+            executor = ThreadPoolExecutor(max_workers=self.workers)
+            submit = lambda job: executor.submit(search_job, job, pool, self.lean)
+
+        pending = {}
+        try:
+            for job in jobs:
+                if self.cache:
+                    cached = self.cache.get(self._key(job))
+                    if cached is not None:
+                        self.stats["cached"] += 1
+                        results.append((job, dict(cached, cached=True)))
+                        continue
+
+                # Bounded in-flight work keeps memory flat for long job lists
+                while len(pending) >= self.workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    self._collect(done, pending, results)
+
+                self.rate_limiter.wait(SEARCH_HOST)
+                pending[submit(job)] = job
+                self.stats["submitted"] += 1
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                self._collect(done, pending, results)
+        finally:
+            executor.shutdown(wait=True)
+            if pool:
+                pool.close()
+                default_registry.save()
+
+        print(f"\n📦 Batch complete: {self.stats}")
+        if self.cache:
+            self.cache.print_stats()
+        default_tracer.print_summary()
+        default_tracer.write_metrics()
+        return results
+
+    @staticmethod
+    def _key(job):
+        return cache_key(job.origin, job.destination, job.departure_date, job.return_date)
+
+    def _collect(self, done, pending, results):
+        for future in done:
+            job = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"status": "error", "error": str(e)}
+
+            if result.get("status") == "success":
+                self.db.save_search(job.origin, job.destination, result["flights"],
+                                    departure_date=job.departure_date, return_date=job.return_date)
+                if self.cache:
+                    self.cache.put(self._key(job), result)
+                self.stats["succeeded"] += 1
+                self.stats["flights"] += len(result["flights"])
+                self.stats["bytes"] += result.get("bytes_transferred") or 0
+            else:
+                print(f"❌ {job.origin} → {job.destination} on {job.departure_date}: {result.get('error')}")
+                self.stats["failed"] += 1
+
+            results.append((job, result))
+
+
+def load_jobs(path):
+    """Read jobs from a CSV file with origin,destination,departure_date[,return_date] columns"""
+    with open(path, newline='') as f:
+        return [
+            SearchJob(row['origin'], row['destination'], row['departure_date'], row.get('return_date') or None)
+            for row in csv.DictReader(f)
+        ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search many routes in parallel")
+    parser.add_argument("jobs", help="CSV file with origin,destination,departure_date[,return_date]")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--processes", action="store_true", help="Use worker processes instead of threads")
+    parser.add_argument("--min-interval", type=float, default=2.0, help="Seconds between searches")
+    parser.add_argument("--show-browser", action="store_true")
+    parser.add_argument("--lean", action="store_true", help="Block images, fonts, media and trackers")
+    parser.add_argument("--cache-ttl", type=float, default=0,
+                        help="Reuse results younger than this many seconds (0 disables the cache)")
+    parser.add_argument("--trace", help="Export spans to this JSON Lines file")
+    add_alert_arguments(parser)
+    args = parser.parse_args()
+    default_tracer.trace_to(args.trace)
+
+    db = FlightDatabase()
+    attach_alerts(db, args)
+    cache = SearchCache(ttl=args.cache_ttl, store=FileCacheStore()) if args.cache_ttl > 0 else None
+
+    runner = BatchRunner(
+        workers=args.workers,
+        db=db,
+        use_processes=args.processes,
+        headless=not args.show_browser,
+        min_interval=args.min_interval,
+        cache=cache,
+        lean=args.lean
+    )
+    runner.run(load_jobs(args.jobs))
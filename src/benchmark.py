@@ -0,0 +1,106 @@
+import argparse
+import contextlib
+import io
+import time
+
+from flight_scraper import GoogleFlightsScraper
+from working_flight_scraper import WorkingFlightScraper
+from html_extractor import PageSnapshot
+from parsing import default_parser, parse_price, parse_times, parse_duration, parse_stops
+from replay import FIXTURE_DIR, iter_fixtures, score
+from tracing import default_tracer
+
+# Individual field parsers timed over every card's text
+FIELD_PARSERS = {
+    "price": parse_price,
+    "times": parse_times,
+    "duration": parse_duration,
+    "stops": parse_stops,
+    "airline": default_parser.carriers.find,
+    "all_fields": default_parser.parse
+}
+
+
+def _timed(func, repeat):
+    """Run func repeat times quietly; return (last result, seconds per run)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = func()
+        elapsed = time.perf_counter() - start
+    return result, elapsed / repeat
+
+
+def bench_fixture(fixture, repeat=20):
+    """Replay one fixture through the extractors and parsers"""
+    page = fixture["html"]
+    expected = fixture.get("expected") or []
+    report = {"fixture": fixture["path"], "extractors": {}, "fields": {}}
+
+    google = GoogleFlightsScraper()
+    working = WorkingFlightScraper()
+    extractors = {
+        "extract_flight_data": lambda: google.extract_flight_data(html=page),
+        "extract_flight_details": lambda: working.extract_flight_details(html=page)
+    }
+    for name, extract in extractors.items():
+        flights, seconds = _timed(extract, repeat)
+        matched, compared = score(flights, expected[:len(flights)] if name == "extract_flight_data" else expected)
+        report["extractors"][name] = {
+            "cards": len(flights),
+            "seconds": seconds,
+            "cards_per_second": len(flights) / seconds if seconds else 0.0,
+            "accuracy": matched / compared if compared else None
+        }
+
+    flights, _ = _timed(lambda: working.extract_flight_details(html=page), 1)
+    texts = [flight.raw_text for flight in flights if flight.raw_text]
+    if not texts:
+        texts = [PageSnapshot(page).root.text]
+    for name, parse in FIELD_PARSERS.items():
+        _, seconds = _timed(lambda: [parse(text) for text in texts], repeat)
+        report["fields"][name] = seconds / len(texts)
+
+    return report
+
+
+def print_report(report):
+    print(f"\n📄 {report['fixture']}")
+    for name, stats in report["extractors"].items():
+        accuracy = "n/a" if stats["accuracy"] is None else f"{stats['accuracy']:.1%}"
+        print(f"   {name:24} {stats['cards']:3d} cards  {stats['seconds'] * 1000:8.2f} ms  "
+              f"{stats['cards_per_second']:10.0f} cards/s  accuracy {accuracy}")
+    print("   Per-card parse time:")
+    for name, seconds in report["fields"].items():
+        print(f"     {name:12} {seconds * 1e6:8.1f} µs")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay saved result pages and benchmark extraction")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="Directory of fixture JSON files")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement")
+    parser.add_argument("--min-accuracy", type=float, default=None,
+                        help="Exit non-zero if any extractor scores below this fraction")
+    args = parser.parse_args(argv)
+    # Keep trace file writes out of the measurements
+    default_tracer.trace_to(None)
+
+    reports = [bench_fixture(fixture, args.repeat) for fixture in iter_fixtures(args.fixtures)]
+    if not reports:
+        print(f"⚠️ No fixtures found in {args.fixtures}")
+        return 1
+
+    for report in reports:
+        print_report(report)
+
+    if args.min_accuracy is not None:
+        for report in reports:
+            for name, stats in report["extractors"].items():
+                if stats["accuracy"] is not None and stats["accuracy"] < args.min_accuracy:
+                    print(f"❌ {name} accuracy {stats['accuracy']:.1%} on {report['fixture']}")
+                    return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
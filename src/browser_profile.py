@@ -0,0 +1,75 @@
+from selenium.common.exceptions import WebDriverException
+
+# Requests a results page can do without: images, fonts, media, map tiles and trackers
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.mp3",
+    "*fonts.gstatic.com*", "*fonts.googleapis.com*",
+    "*maps.googleapis.com*", "*khms*.google.com*", "*tile.googleapis.com*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*googleadservices.com*"
+]
+
+# Content settings: 2 = block
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2
+}
+
+LEAN_ARGUMENTS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--mute-audio"
+]
+
+# Browsers keep only 250 resource timing entries by default. Results pages can
+# load more, after which network_idle's resource count stops moving and
+# bytes_transferred undercounts, so the buffer is raised on every page.
+RESOURCE_BUFFER_SIZE = 5000
+RESOURCE_BUFFER_JS = f"performance.setResourceTimingBufferSize({RESOURCE_BUFFER_SIZE});"
+
+# Bytes the current document and its subresources came over the wire with
+# (cross-origin responses without Timing-Allow-Origin report 0)
+TRANSFERRED_BYTES_JS = """
+return performance.getEntriesByType('navigation')
+    .concat(performance.getEntriesByType('resource'))
+    .reduce((total, entry) => total + (entry.transferSize || 0), 0)
+"""
+
+
+def apply_lean_profile(options):
+    """Turn off images and other heavy content in Chrome options"""
+    options.add_experimental_option("prefs", LEAN_PREFS)
+    for argument in LEAN_ARGUMENTS:
+        options.add_argument(argument)
+    return options
+
+
+def block_resources(driver, patterns=BLOCKED_URL_PATTERNS):
+    """Make the browser drop requests matching any pattern before they are sent"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+
+def enlarge_resource_buffer(driver):
+    """Raise the resource timing buffer on every document before its own scripts run"""
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": RESOURCE_BUFFER_JS})
+
+
+def bytes_transferred(driver):
+    """Bytes downloaded for the current page, or None if the browser can't tell"""
+    try:
+        return driver.execute_script(TRANSFERRED_BYTES_JS)
+    except WebDriverException:
+        return None
+
+
+def format_bytes(count):
+    if count is None:
+        return "unknown"
+    if count < 1024 * 1024:
+        return f"{count / 1024:.0f} KB"
+    return f"{count / (1024 * 1024):.1f} MB"
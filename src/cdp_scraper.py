@@ -0,0 +1,313 @@
+import asyncio
+import base64
+import itertools
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+import urllib.request
+
+import websockets
+
+from flight_scraper import GoogleFlightsScraper, FLIGHT_SELECTORS
+from payload_decoder import decode_flights, is_results_url, merge_flights
+from search_url import build_search_url
+from browser_profile import BLOCKED_URL_PATTERNS, LEAN_ARGUMENTS
+
+CHROME_CANDIDATES = [
+    'google-chrome', 'chrome', 'chromium', 'chromium-browser',
+    r'C:\Program Files\Google\Chrome\Application\chrome.exe'
+]
+
+HIDE_WEBDRIVER_JS = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+
+
+class CDPError(Exception):
+    """An error response from the DevTools protocol"""
+
+
+class CDPConnection:
+    """One DevTools websocket shared by every tab through flattened sessions"""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._listeners = []
+        self._reader = asyncio.create_task(self._read())
+
+    @classmethod
+    async def connect(cls, url):
+        ws = await websockets.connect(url, max_size=None)
+        return cls(ws)
+
+    async def send(self, method, params=None, session_id=None):
+        """Send a command and wait for its result"""
+        message_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        await self.ws.send(json.dumps(message))
+        return await future
+
+    def listen(self, session_id, callback):
+        """Call callback(method, params) for every event of a session; returns an unsubscribe function"""
+        entry = (session_id, callback)
+        self._listeners.append(entry)
+        return lambda: self._listeners.remove(entry)
+
+    async def _read(self):
+        try:
+            async for raw in self.ws:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self._pending.pop(message["id"], None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(CDPError(message["error"].get("message", message["error"])))
+                    else:
+                        future.set_result(message.get("result", {}))
+                else:
+                    for session_id, callback in list(self._listeners):
+                        if session_id == message.get("sessionId"):
+                            callback(message["method"], message.get("params", {}))
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(CDPError("DevTools connection closed"))
+            self._pending.clear()
+
+    async def close(self):
+        await self.ws.close()
+        await asyncio.gather(self._reader, return_exceptions=True)
+
+
+class ResponseCapture:
+    """Collect and decode the results data responses of one tab"""
+
+    def __init__(self, connection, session_id):
+        self.connection = connection
+        self.session_id = session_id
+        self.batches = []
+        self.ready = asyncio.Event()
+        self._request_ids = set()
+        self._tasks = []
+        self._unsubscribe = connection.listen(session_id, self._on_event)
+
+    def _on_event(self, method, params):
+        if method == "Network.responseReceived" and is_results_url(params["response"]["url"]):
+            self._request_ids.add(params["requestId"])
+        elif method == "Network.loadingFinished" and params["requestId"] in self._request_ids:
+            self._tasks.append(asyncio.create_task(self._fetch(params["requestId"])))
+
+    async def _fetch(self, request_id):
+        try:
+            result = await self.connection.send("Network.getResponseBody", {"requestId": request_id}, self.session_id)
+        except CDPError:
+            return
+        body = result.get("body", "")
+        if result.get("base64Encoded"):
+            body = base64.b64decode(body).decode("utf-8", errors="replace")
+        flights = decode_flights(body)
+        if flights:
+            self.batches.append(flights)
+            self.ready.set()
+
+    async def wait(self, timeout, grace=0.5):
+        """Wait for the first decoded response, then briefly for any follow-ups"""
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        await asyncio.sleep(grace)
+        return merge_flights(self.batches)
+
+    def close(self):
+        self._unsubscribe()
+        for task in self._tasks:
+            task.cancel()
+
+
+class AsyncGoogleFlightsScraper:
+    """Drive many Google Flights tabs from one event loop over the DevTools protocol
+
+    Exposes the same search/extract interface as GoogleFlightsScraper but
+    reads flights from the results data responses, falling back to the
+    data embedded in the page and finally to DOM extraction.
+    """
+
+    def __init__(self, headless=True, chrome_path=None, port=9222, max_tabs=8, lean=False):
+        self.headless = headless
+        self.chrome_path = chrome_path or next(filter(None, map(shutil.which, CHROME_CANDIDATES)), None)
+        self.port = port
+        self.tabs = asyncio.Semaphore(max_tabs)
+        self.lean = lean
+        self.process = None
+        self.profile_dir = None
+        self.connection = None
+        # Reuses the synchronous scraper's offline DOM extraction
+        self._extractor = GoogleFlightsScraper(interactive=False)
+
+    async def start(self):
+        """Launch Chrome with remote debugging and connect to it"""
+        if not self.chrome_path:
+            raise RuntimeError("Chrome executable not found; pass chrome_path")
+        self.profile_dir = tempfile.TemporaryDirectory(prefix="flights-cdp-")
+        args = [
+            self.chrome_path,
+            f"--remote-debugging-port={self.port}",
+            f"--user-data-dir={self.profile_dir.name}",
+            "--disable-blink-features=AutomationControlled",
+            "--disable-gpu",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "about:blank"
+        ]
+        if self.headless:
+            args.insert(1, "--headless=new")
+        if self.lean:
+            args[1:1] = LEAN_ARGUMENTS
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        ws_url = await self._browser_ws_url()
+        self.connection = await CDPConnection.connect(ws_url)
+        print(f"🚀 Chrome DevTools connected on port {self.port}")
+
+    async def _browser_ws_url(self, timeout=15):
+        url = f"http://127.0.0.1:{self.port}/json/version"
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                body = await asyncio.to_thread(lambda: urllib.request.urlopen(url, timeout=1).read())
+                return json.loads(body)["webSocketDebuggerUrl"]
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Chrome did not open its DevTools port in time")
+                await asyncio.sleep(0.2)
+
+    async def close(self):
+        if self.connection:
+            try:
+                await self.connection.send("Browser.close")
+            except CDPError:
+                pass
+            await self.connection.close()
+            self.connection = None
+        if self.process:
+            try:
+                # Off the event loop, so other tabs' tasks keep running while Chrome exits
+                await asyncio.to_thread(self.process.wait, 5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                await asyncio.to_thread(self.process.wait)
+            self.process = None
+        if self.profile_dir:
+            self.profile_dir.cleanup()
+            self.profile_dir = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def search_flights(self, origin, destination, departure_date, return_date=None,
+                             adults=1, cabin="economy", timeout=30):
+        """Search one route in its own tab and return the same result dict as GoogleFlightsScraper"""
+        print(f"🔍 Searching flights from {origin} to {destination} on {departure_date}")
+        url = build_search_url(origin, destination, departure_date, return_date, adults=adults, cabin=cabin)
+
+        async with self.tabs:
+            start = time.perf_counter()
+            target = await self.connection.send("Target.createTarget", {"url": "about:blank"})
+            session_id = (await self.connection.send(
+                "Target.attachToTarget", {"targetId": target["targetId"], "flatten": True}
+            ))["sessionId"]
+            capture = ResponseCapture(self.connection, session_id)
+            try:
+                await self.connection.send("Network.enable", session_id=session_id)
+                if self.lean:
+                    await self.connection.send("Network.setBlockedURLs",
+                                               {"urls": BLOCKED_URL_PATTERNS}, session_id)
+                await self.connection.send("Page.addScriptToEvaluateOnNewDocument",
+                                           {"source": HIDE_WEBDRIVER_JS}, session_id)
+                await self.connection.send("Page.navigate", {"url": url}, session_id)
+
+                flights = await capture.wait(timeout)
+                source = "network"
+                if not flights:
+                    html = await self._results_html(session_id, timeout)
+                    flights = decode_flights(html)
+                    source = "page_data"
+                    if not flights:
+                        flights = self.extract_flight_data(html)
+                        source = "dom"
+
+                return {
+                    "status": "success",
+                    "origin": origin,
+                    "destination": destination,
+                    "departure_date": departure_date,
+                    "flights_found": len(flights),
+                    "flights": flights,
+                    "source": source,
+                    "seconds": round(time.perf_counter() - start, 3)
+                }
+            except Exception as e:
+                print(f"❌ Error during search: {str(e)}")
+                return {"status": "error", "error": str(e)}
+            finally:
+                capture.close()
+                try:
+                    await self.connection.send("Target.closeTarget", {"targetId": target["targetId"]})
+                except CDPError:
+                    pass
+
+    async def _evaluate(self, session_id, expression):
+        result = await self.connection.send(
+            "Runtime.evaluate", {"expression": expression, "returnByValue": True}, session_id
+        )
+        return result.get("result", {}).get("value")
+
+    async def _results_html(self, session_id, timeout):
+        """Wait until result cards render (or time out) and return the page HTML"""
+        selectors = json.dumps([s.source for s in FLIGHT_SELECTORS])
+        check = f"{selectors}.some(s => document.querySelectorAll(s).length > 0)"
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if await self._evaluate(session_id, check):
+                break
+            await asyncio.sleep(0.25)
+        return await self._evaluate(session_id, "document.documentElement.outerHTML") or ""
+
+    def extract_flight_data(self, html):
+        """Extract flights from rendered results HTML"""
+        return self._extractor.extract_flight_data(html=html)
+
+    async def search_many(self, searches):
+        """Run (origin, destination, departure_date[, return_date]) searches concurrently"""
+        return await asyncio.gather(*(self.search_flights(*search) for search in searches))
+
+
+async def _demo():
+    async with AsyncGoogleFlightsScraper() as scraper:
+        results = await scraper.search_many([
+            ("JFK", "LAX", "2025-12-15"),
+            ("SFO", "SEA", "2025-12-15"),
+            ("ORD", "MIA", "2025-12-15")
+        ])
+    for result in results:
+        if result["status"] == "success":
+            print(f"✈️ {result['origin']} → {result['destination']}: "
+                  f"{result['flights_found']} flights via {result['source']} in {result['seconds']}s")
+        else:
+            print(f"❌ {result['error']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(_demo())
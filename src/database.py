@@ -2,127 +2,540 @@
 import sqlite3
 from datetime import datetime
 import json
+import threading
+import hashlib
+import zlib
 from pathlib import Path
+from models import Flight
+from parsing import parse_price, parse_duration, parse_stops
+from tracing import traced, annotate
+
+# Applied to every connection; WAL lets readers run while a batch is being written
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA busy_timeout=5000"
+]
+
+def _normalize_legacy_flights(conn):
+    """Convert text prices, durations and stops stored by older scrapers to numbers"""
+    rows = conn.execute('''
+        SELECT id, price, duration, stops FROM flights
+        WHERE typeof(price) = 'text' OR typeof(stops) = 'text' OR price_cents IS NULL
+    ''').fetchall()
+    
+    updates = []
+    for flight_id, price, duration, stops in rows:
+        if isinstance(price, str):
+            price_cents, currency = parse_price(price)
+        elif price is not None:
+            price_cents, currency = round(price * 100), 'USD'
+        else:
+            price_cents, currency = None, None
+        minutes = parse_duration(duration) if isinstance(duration, str) else None
+        if isinstance(stops, str):
+            stops = parse_stops(stops)
+        updates.append((
+            None if price_cents is None else price_cents / 100,
+            price_cents,
+            currency,
+            minutes,
+            stops,
+            flight_id
+        ))
+    
+    conn.executemany('''
+        UPDATE flights SET price = ?, price_cents = ?, currency = ?, duration_minutes = ?, stops = ?
+        WHERE id = ?
+    ''', updates)
+
+
+def text_hash(text):
+    """Content address of a card text blob"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _blob_rows(texts):
+    """(hash, compressed text) for each distinct non-empty text"""
+    return [(text_hash(text), zlib.compress(text.encode('utf-8'), 9)) for text in set(texts) if text]
+
+
+def _move_text_to_blobs(conn):
+    """Replace inline raw_text/flight_details with references into raw_blobs"""
+    rows = conn.execute('''
+        SELECT id, raw_text, flight_details FROM flights
+        WHERE raw_text IS NOT NULL OR flight_details IS NOT NULL
+    ''').fetchall()
+    
+    conn.executemany(
+        "INSERT OR IGNORE INTO raw_blobs (hash, data) VALUES (?, ?)",
+        _blob_rows(text for _, raw_text, details in rows for text in (raw_text, details))
+    )
+    conn.executemany('''
+        UPDATE flights SET raw_hash = ?, details_hash = ?, raw_text = NULL, flight_details = NULL
+        WHERE id = ?
+    ''', [
+        (text_hash(raw_text) if raw_text else None, text_hash(details) if details else None, flight_id)
+        for flight_id, raw_text, details in rows
+    ])
+
+
+# Rebuilds the daily summary from the flights table
+REBUILD_DAILY_PRICES = '''
+    INSERT OR REPLACE INTO route_daily_prices
+    SELECT fs.origin, fs.destination, DATE(fs.search_date),
+           MIN(f.price), MAX(f.price), SUM(f.price), COUNT(f.price)
+    FROM flight_searches fs
+    JOIN flights f ON fs.id = f.search_id
+    WHERE typeof(f.price) IN ('integer', 'real')
+    GROUP BY fs.origin, fs.destination, DATE(fs.search_date)
+'''
+
+# Schema migrations, applied in order and tracked with PRAGMA user_version.
+# Each step is a SQL statement or a callable taking the connection.
+MIGRATIONS = [
+    # 1: indexes for route lookups and joins, plus a daily per-route price summary
+    [
+        "CREATE INDEX IF NOT EXISTS idx_searches_route_date ON flight_searches (origin, destination, search_date)",
+        "CREATE INDEX IF NOT EXISTS idx_flights_search_id ON flights (search_id)",
+        '''
+        CREATE TABLE IF NOT EXISTS route_daily_prices (
+            origin TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            day DATE NOT NULL,
+            min_price REAL,
+            max_price REAL,
+            price_sum REAL,
+            price_count INTEGER,
+            PRIMARY KEY (origin, destination, day)
+        ) WITHOUT ROWID
+        ''',
+        REBUILD_DAILY_PRICES
+    ],
+    # 2: typed numeric columns for Flight records, converting legacy text values
+    [
+        "ALTER TABLE flights ADD COLUMN price_cents INTEGER",
+        "ALTER TABLE flights ADD COLUMN currency TEXT",
+        "ALTER TABLE flights ADD COLUMN duration_minutes INTEGER",
+        _normalize_legacy_flights,
+        "DELETE FROM route_daily_prices",
+        REBUILD_DAILY_PRICES
+    ],
+    # 3: price watch rules and the last-known minimum per route and departure date
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS watch_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            origin TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            date_from DATE,
+            date_to DATE,
+            max_price_cents INTEGER,
+            drop_percent REAL,
+            active INTEGER NOT NULL DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_watch_rules_route ON watch_rules (origin, destination)",
+        '''
+        CREATE TABLE IF NOT EXISTS route_min_prices (
+            origin TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            departure_date TEXT NOT NULL,
+            min_price_cents INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (origin, destination, departure_date)
+        ) WITHOUT ROWID
+        '''
+    ],
+    # 4: card texts stored once, zlib-compressed and addressed by hash
+    [
+        "CREATE TABLE IF NOT EXISTS raw_blobs (hash TEXT PRIMARY KEY, data BLOB NOT NULL) WITHOUT ROWID",
+        "ALTER TABLE flights ADD COLUMN raw_hash TEXT",
+        "ALTER TABLE flights ADD COLUMN details_hash TEXT",
+        _move_text_to_blobs
+    ],
+    # 5: days between departure and arrival, so overnight flights keep their "+1"
+    [
+        "ALTER TABLE flights ADD COLUMN arrival_day_offset INTEGER NOT NULL DEFAULT 0"
+    ]
+]
 
 class FlightDatabase:
     def __init__(self, db_path='data/flight_history.db'):
         """Initialize database connection"""
         # Create data directory if it doesn't exist
-        Path('data').mkdir(exist_ok=True)
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
         self.db_path = db_path
+        # One long-lived connection, shared across threads behind a lock
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        # Called with the saved searches (including their search_id) after each commit
+        self.listeners = []
+        for pragma in PRAGMAS:
+            self.conn.execute(pragma)
         self.create_tables()
     
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            if self.conn:
+                self.conn.close()
+                self.conn = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def add_listener(self, callback):
+        """Register callback(searches) to run after searches are saved
+        
+        Streamed searches (start_search/add_flights) are reported once, by
+        finish_search, rather than after every batch.
+        """
+        self.listeners.append(callback)
+    
+    def _notify(self, searches):
+        for callback in self.listeners:
+            try:
+                callback(searches)
+            except Exception as e:
+                print(f"⚠️ Save listener failed: {e}")
+    
     def create_tables(self):
         """Create database tables if they don't exist"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self.lock:
+            cursor = self.conn.cursor()
+            
+            # Table for search metadata
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS flight_searches (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    search_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    origin TEXT NOT NULL,
+                    destination TEXT NOT NULL,
+                    departure_date DATE,
+                    return_date DATE,
+                    search_type TEXT
+                )
+            ''')
+            
+            # Table for individual flights
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS flights (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    search_id INTEGER NOT NULL,
+                    price REAL,
+                    airline TEXT,
+                    departure_time TEXT,
+                    arrival_time TEXT,
+                    duration TEXT,
+                    stops INTEGER,
+                    flight_details TEXT,
+                    raw_text TEXT,
+                    FOREIGN KEY (search_id) REFERENCES flight_searches(id)
+                )
+            ''')
+            
+            self.conn.commit()
+            self.migrate()
+        print("✅ Database tables created successfully!")
+    
+    def migrate(self):
+        """Apply any schema migrations newer than the database's user_version
         
-        # Table for search metadata
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS flight_searches (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                search_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                origin TEXT NOT NULL,
-                destination TEXT NOT NULL,
-                departure_date DATE,
-                return_date DATE,
-                search_type TEXT
-            )
-        ''')
+        Each migration runs in an explicit transaction together with its
+        user_version bump. sqlite3 would otherwise commit ALTER/CREATE
+        statements immediately, leaving a half-applied migration behind.
+        """
+        with self.lock:
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            isolation_level = self.conn.isolation_level
+            self.conn.isolation_level = None
+            try:
+                for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+                    self.conn.execute("BEGIN")
+                    try:
+                        for statement in statements:
+                            if callable(statement):
+                                statement(self.conn)
+                            else:
+                                self.conn.execute(statement)
+                        self.conn.execute(f"PRAGMA user_version = {number}")
+                        self.conn.execute("COMMIT")
+                    except BaseException:
+                        self.conn.execute("ROLLBACK")
+                        raise
+                    print(f"🔧 Applied database migration {number}")
+            finally:
+                self.conn.isolation_level = isolation_level
+    
+    def _insert_search(self, cursor, origin, destination, flights_data, departure_date=None, return_date=None,
+                       search_date=None):
+        """Insert one search and its flights on an open cursor, returning the search id
         
-        # Table for individual flights
+        search_date (UTC, 'YYYY-MM-DD HH:MM:SS') defaults to now; imports pass
+        the time the search actually ran.
+        """
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS flights (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                search_id INTEGER NOT NULL,
-                price REAL,
-                airline TEXT,
-                departure_time TEXT,
-                arrival_time TEXT,
-                duration TEXT,
-                stops INTEGER,
-                flight_details TEXT,
-                raw_text TEXT,
-                FOREIGN KEY (search_id) REFERENCES flight_searches(id)
+            INSERT INTO flight_searches (origin, destination, departure_date, return_date, search_date)
+            VALUES (?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+        ''', (origin, destination, departure_date, return_date, search_date))
+        
+        search_id = cursor.lastrowid
+        self._insert_flights(cursor, search_id, origin, destination, flights_data, search_date)
+        return search_id
+    
+    def _insert_flights(self, cursor, search_id, origin, destination, flights_data, search_date=None):
+        """Insert flights for an existing search and fold them into the daily summary"""
+        # Card texts repeat across scrapes, so each distinct text is stored once
+        cursor.executemany(
+            "INSERT OR IGNORE INTO raw_blobs (hash, data) VALUES (?, ?)",
+            _blob_rows(text for flight in flights_data for text in (flight.raw_text, flight.details))
+        )
+        
+        cursor.executemany('''
+            INSERT INTO flights (
+                search_id, price, price_cents, currency, airline, departure_time,
+                arrival_time, arrival_day_offset, duration, duration_minutes, stops, details_hash, raw_hash
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (
+                search_id,
+                flight.price,
+                flight.price_cents,
+                flight.currency,
+                flight.airline,
+                flight.departure_time,
+                flight.arrival_time,
+                flight.arrival_day_offset or 0,
+                flight.duration,
+                flight.duration_minutes,
+                flight.stops,
+                text_hash(flight.details) if flight.details else None,
+                text_hash(flight.raw_text) if flight.raw_text else None
             )
-        ''')
+            for flight in flights_data
+        ])
         
-        conn.commit()
-        conn.close()
-        print("✅ Database tables created successfully!")
+        self._update_daily_prices(cursor, origin, destination, flights_data, search_date)
+    
+    def _update_daily_prices(self, cursor, origin, destination, flights_data, search_date=None):
+        """Fold a search's prices into the route_daily_prices row of its day (today by default)"""
+        prices = [flight.price for flight in flights_data if flight.price is not None]
+        if not prices:
+            return
+        
+        cursor.execute('''
+            INSERT INTO route_daily_prices (origin, destination, day, min_price, max_price, price_sum, price_count)
+            VALUES (?, ?, DATE(COALESCE(?, 'now')), ?, ?, ?, ?)
+            ON CONFLICT (origin, destination, day) DO UPDATE SET
+                min_price = MIN(min_price, excluded.min_price),
+                max_price = MAX(max_price, excluded.max_price),
+                price_sum = price_sum + excluded.price_sum,
+                price_count = price_count + excluded.price_count
+        ''', (origin, destination, search_date, min(prices), max(prices), sum(prices), len(prices)))
     
     def save_search(self, origin, destination, flights_data, departure_date=None, return_date=None):
         """Save a complete search and its results"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        ids = self.save_searches([{
+            "origin": origin,
+            "destination": destination,
+            "flights": flights_data,
+            "departure_date": departure_date,
+            "return_date": return_date
+        }])
+        return ids[0] if ids else None
+    
+    @traced("db.save_searches")
+    def save_searches(self, searches):
+        """Save many searches in a single transaction
         
-        try:
-            # Insert search record
-            cursor.execute('''
+        Each search is a dict with origin, destination, flights and optional
+        departure_date/return_date/search_date. Returns the new search ids in order.
+        """
+        searches = [
+            dict(search, flights=[Flight.coerce(flight) for flight in search["flights"]])
+            for search in searches
+        ]
+        with self.lock:
+            cursor = self.conn.cursor()
+            try:
+                search_ids = [
+                    self._insert_search(
+                        cursor,
+                        search["origin"],
+                        search["destination"],
+                        search["flights"],
+                        search.get("departure_date"),
+                        search.get("return_date"),
+                        search.get("search_date")
+                    )
+                    for search in searches
+                ]
+                self.conn.commit()
+            except Exception as e:
+                print(f"❌ Error saving to database: {e}")
+                self.conn.rollback()
+                return []
+        
+        total = sum(len(search["flights"]) for search in searches)
+        print(f"✅ Saved {total} flights to database!")
+        annotate(searches=len(searches), flights=total)
+        if self.listeners:
+            self._notify([dict(search, search_id=search_id) for search, search_id in zip(searches, search_ids)])
+        return search_ids
+    
+    def start_search(self, origin, destination, departure_date=None, return_date=None):
+        """Create an empty search to stream flights into with add_flights; returns its id"""
+        with self.lock:
+            cursor = self.conn.execute('''
                 INSERT INTO flight_searches (origin, destination, departure_date, return_date)
                 VALUES (?, ?, ?, ?)
             ''', (origin, destination, departure_date, return_date))
+            self.conn.commit()
+            return cursor.lastrowid
+    
+    @traced("db.add_flights")
+    def add_flights(self, search_id, flights_data):
+        """Append a batch of flights to a search in one transaction; returns whether it was saved
+        
+        Listeners are not called here; call finish_search once the stream ends.
+        """
+        flights_data = [Flight.coerce(flight) for flight in flights_data]
+        with self.lock:
+            origin, destination, search_date = self.conn.execute(
+                "SELECT origin, destination, search_date FROM flight_searches WHERE id = ?",
+                (search_id,)
+            ).fetchone()
+            cursor = self.conn.cursor()
+            try:
+                self._insert_flights(cursor, search_id, origin, destination, flights_data, search_date)
+                self.conn.commit()
+            except Exception as e:
+                print(f"❌ Error saving to database: {e}")
+                self.conn.rollback()
+                return False
+        
+        annotate(flights=len(flights_data))
+        return True
+    
+    def finish_search(self, search_id, flights_data):
+        """Report a streamed search to the listeners once, with the flights that summarize it
+        
+        Pass the search's cheapest flight rather than every flight, so streams
+        stay bounded in memory.
+        """
+        if not self.listeners:
+            return
+        with self.lock:
+            origin, destination, departure_date, return_date, search_date = self.conn.execute(
+                "SELECT origin, destination, departure_date, return_date, search_date FROM flight_searches WHERE id = ?",
+                (search_id,)
+            ).fetchone()
+        self._notify([{
+            "origin": origin,
+            "destination": destination,
+            "flights": [Flight.coerce(flight) for flight in flights_data],
+            "departure_date": departure_date,
+            "return_date": return_date,
+            "search_date": search_date,
+            "search_id": search_id
+        }])
+    
+    def get_price_history(self, origin, destination, days=30):
+        """Get price history for a route
+        
+        Served from the route_daily_prices summary, one row per day:
+        (day, min_price, avg_price, max_price).
+        """
+        with self.lock:
+            cursor = self.conn.cursor()
             
-            search_id = cursor.lastrowid
-            
-            # Insert each flight
-            for flight in flights_data:
-                cursor.execute('''
-                    INSERT INTO flights (
-                        search_id, price, airline, departure_time, 
-                        arrival_time, duration, stops, flight_details, raw_text
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    search_id,
-                    flight.get('price'),
-                    flight.get('airline'),
-                    flight.get('departure'),
-                    flight.get('arrival'),
-                    flight.get('duration'),
-                    flight.get('stops'),
-                    flight.get('details'),
-                    flight.get('raw_text')
-                ))
-            
-            conn.commit()
-            print(f"✅ Saved {len(flights_data)} flights to database!")
-            return search_id
+            cursor.execute('''
+                SELECT
+                    day,
+                    min_price,
+                    price_sum / price_count as avg_price,
+                    max_price
+                FROM route_daily_prices
+                WHERE origin = ? AND destination = ?
+                    AND day >= DATE('now', '-' || ? || ' days')
+                ORDER BY day
+            ''', (origin, destination, days))
             
-        except Exception as e:
-            print(f"❌ Error saving to database: {e}")
-            conn.rollback()
-        finally:
-            conn.close()
+            return cursor.fetchall()
     
-    def get_price_history(self, origin, destination, days=30):
-        """Get price history for a route"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def get_search_flights(self, search_id):
+        """Load a saved search's flights as Flight records, card texts included"""
+        with self.lock:
+            rows = self.conn.execute('''
+                SELECT f.price_cents, f.currency, f.duration_minutes, f.stops, f.airline,
+                       f.departure_time, f.arrival_time, f.arrival_day_offset,
+                       COALESCE(f.flight_details, details.data), COALESCE(f.raw_text, raw.data)
+                FROM flights f
+                LEFT JOIN raw_blobs details ON details.hash = f.details_hash
+                LEFT JOIN raw_blobs raw ON raw.hash = f.raw_hash
+                WHERE f.search_id = ?
+                ORDER BY f.id
+            ''', (search_id,)).fetchall()
         
-        cursor.execute('''
-            SELECT 
-                fs.search_date,
-                MIN(f.price) as min_price,
-                AVG(f.price) as avg_price,
-                MAX(f.price) as max_price
-            FROM flight_searches fs
-            JOIN flights f ON fs.id = f.search_id
-            WHERE fs.origin = ? AND fs.destination = ?
-                AND fs.search_date >= datetime('now', '-' || ? || ' days')
-                AND f.price IS NOT NULL
-            GROUP BY DATE(fs.search_date)
-            ORDER BY fs.search_date
-        ''', (origin, destination, days))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        return results
+        def text(value):
+            return zlib.decompress(value).decode('utf-8') if isinstance(value, bytes) else value
+        
+        return [
+            Flight(index, price_cents, currency, minutes, stops, airline, departure_time, arrival_time,
+                   day_offset, details=text(details), raw_text=text(raw_text))
+            for index, (price_cents, currency, minutes, stops, airline, departure_time, arrival_time,
+                        day_offset, details, raw_text) in enumerate(rows, start=1)
+        ]
+    
+    def _file_size(self):
+        """Bytes used by the database file and its write-ahead log"""
+        return sum(
+            path.stat().st_size
+            for path in (Path(self.db_path), Path(f"{self.db_path}-wal"))
+            if path.exists()
+        )
+    
+    @traced("db.compact")
+    def compact(self):
+        """Drop card texts no flight refers to any more and VACUUM the file"""
+        with self.lock:
+            # Fold the write-ahead log in first, so both sizes cover everything on disk
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            before = self._file_size()
+            with self.conn:
+                removed = self.conn.execute('''
+                    DELETE FROM raw_blobs WHERE hash NOT IN (
+                        SELECT raw_hash FROM flights WHERE raw_hash IS NOT NULL
+                        UNION
+                        SELECT details_hash FROM flights WHERE details_hash IS NOT NULL
+                    )
+                ''').rowcount
+            self.conn.execute("VACUUM")
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            after = self._file_size()
+        print(f"🧹 Removed {removed} unused card texts; database {before / 1024:.0f} KB → {after / 1024:.0f} KB")
+        return removed
 
 
 # Test function
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Flight history database")
+    parser.add_argument("command", nargs="?", choices=["init", "compact"], default="init")
+    parser.add_argument("--db", default='data/flight_history.db')
+    args = parser.parse_args()
+    
     # Test database creation
-    db = FlightDatabase()
+    db = FlightDatabase(args.db)
     print("Database initialized!")
+    if args.command == "compact":
+        db.compact()
@@ -0,0 +1,111 @@
+import argparse
+from datetime import date, timedelta
+
+from flight_scraper import GoogleFlightsScraper
+from database import FlightDatabase
+from alerts import add_alert_arguments, attach_alerts
+
+
+def date_range(start_date, end_date):
+    """Every ISO date from start_date to end_date inclusive"""
+    day = date.fromisoformat(str(start_date))
+    end = date.fromisoformat(str(end_date))
+    while day <= end:
+        yield day.isoformat()
+        day += timedelta(days=1)
+
+
+def cheapest_price(result):
+    """Lowest price in cents of a search result, or None"""
+    prices = [flight.price_cents for flight in result.get("flights", []) if flight.price_cents is not None]
+    return min(prices) if prices else None
+
+
+class DateSweep:
+    """Search one route across a window of departure dates in a single browser session
+
+    The browser is started once and every date is opened by deep link, so
+    only the first search pays for the cold start. Results are written to
+    the database in one transaction at the end.
+    """
+
+    def __init__(self, scraper=None, db=None):
+        self.scraper = scraper if scraper is not None else GoogleFlightsScraper(
+            headless=True, interactive=False, lean=True
+        )
+        self.db = db
+
+    def run(self, origin, destination, start_date, end_date, stay_days=None, adults=1, cabin="economy"):
+        """Search every departure date in the window and return a list of (date, result)
+
+        stay_days makes each search a round trip returning that many days later.
+        """
+        results = []
+        try:
+            for departure_date in date_range(start_date, end_date):
+                return_date = None
+                if stay_days is not None:
+                    return_date = (date.fromisoformat(departure_date) + timedelta(days=stay_days)).isoformat()
+                # Restart the session if the previous search broke the driver
+                if self.scraper.driver is None:
+                    self.scraper.start_driver()
+                result = self.scraper.search_flights(origin, destination, departure_date, return_date,
+                                                     adults=adults, cabin=cabin)
+                results.append((departure_date, dict(result, return_date=return_date)))
+        finally:
+            self.scraper.close_driver()
+
+        if self.db is not None:
+            self.db.save_searches([
+                {
+                    "origin": origin,
+                    "destination": destination,
+                    "flights": result["flights"],
+                    "departure_date": departure_date,
+                    "return_date": result["return_date"]
+                }
+                for departure_date, result in results
+                if result.get("status") == "success" and not result.get("cached")
+            ])
+        return results
+
+    @staticmethod
+    def cheapest(results):
+        """Return (date, price_cents) of the cheapest day, or None"""
+        priced = [(cheapest_price(result), day) for day, result in results if cheapest_price(result) is not None]
+        if not priced:
+            return None
+        price, day = min(priced)
+        return day, price
+
+    @staticmethod
+    def print_summary(results):
+        print("\n📅 Lowest price by departure date:")
+        for day, result in results:
+            price = cheapest_price(result)
+            print(f"   {day}: {'n/a' if price is None else f'{price / 100:.2f}'}")
+        best = DateSweep.cheapest(results)
+        if best:
+            print(f"💰 Cheapest day: {best[0]} at {best[1] / 100:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the cheapest departure date in a window")
+    parser.add_argument("origin")
+    parser.add_argument("destination")
+    parser.add_argument("start_date", help="First departure date (YYYY-MM-DD)")
+    parser.add_argument("end_date", help="Last departure date (YYYY-MM-DD)")
+    parser.add_argument("--stay", type=int, default=None, help="Round trip returning this many days later")
+    parser.add_argument("--show-browser", action="store_true")
+    parser.add_argument("--capture", action="store_true", help="Decode results from network responses")
+    parser.add_argument("--no-save", action="store_true", help="Don't write results to the database")
+    add_alert_arguments(parser)
+    args = parser.parse_args()
+
+    scraper = GoogleFlightsScraper(headless=not args.show_browser, interactive=False,
+                                   lean=True, capture=args.capture)
+    db = None if args.no_save else FlightDatabase()
+    attach_alerts(db, args)
+    sweep = DateSweep(scraper, db=db)
+    sweep_results = sweep.run(args.origin, args.destination, args.start_date, args.end_date, args.stay)
+    DateSweep.print_summary(sweep_results)
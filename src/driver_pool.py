@@ -0,0 +1,180 @@
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException
+from contextlib import contextmanager
+import queue
+import threading
+
+from browser_profile import apply_lean_profile, block_resources, enlarge_resource_buffer, BLOCKED_URL_PATTERNS
+
+# Errors from reading page content; anything else (e.g. urllib3's MaxRetryError
+# once chromedriver has died) may leave the driver unusable
+PARSE_ERRORS = (ValueError, KeyError, IndexError, TypeError)
+
+
+def driver_broken(exc):
+    """Whether an error raised during a search means its driver should not be reused"""
+    return exc is not None and not isinstance(exc, PARSE_ERRORS)
+
+
+def chrome_options(headless=False, lean=False):
+    """Chrome options with the anti-detection flags used by the scrapers
+
+    lean=True also turns off images and other heavy content.
+    """
+    options = webdriver.ChromeOptions()
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+
+    if headless:
+        options.add_argument('--headless')
+
+    if lean:
+        apply_lean_profile(options)
+
+    return options
+
+
+def launch_driver(service, options, blocked_urls=None):
+    """Start a Chrome driver, hide the webdriver flag and block any blocked_urls patterns"""
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    enlarge_resource_buffer(driver)
+    if blocked_urls:
+        block_resources(driver, blocked_urls)
+    driver.maximize_window()
+    return driver
+
+
+class DriverPool:
+    """Keep warm Chrome instances and hand them out one search at a time
+
+    Drivers are reset (extra tabs closed, cookies and storage cleared)
+    between uses and replaced after ``max_uses`` searches or when a search
+    reports them broken. With ``lean`` the drivers skip images, fonts,
+    media and third-party hosts.
+    """
+
+    def __init__(self, size=2, headless=True, max_uses=25, driver_path='./chromedriver.exe', options=None,
+                 lean=False):
+        self.size = size
+        self.max_uses = max_uses
+        self.driver_path = driver_path
+        self.options = options if options is not None else chrome_options(headless, lean)
+        self.blocked_urls = BLOCKED_URL_PATTERNS if lean else None
+        self._idle = queue.LifoQueue()
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def warm_up(self):
+        """Start drivers until the pool is full"""
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    return
+                self._created += 1
+            self._idle.put(self._spawn())
+
+    def _spawn(self):
+        try:
+            driver = launch_driver(Service(self.driver_path), self.options, self.blocked_urls)
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        self._uses[id(driver)] = 0
+        print(f"🚀 Started pooled driver ({self._created}/{self.size})")
+        return driver
+
+    def acquire(self, timeout=None):
+        """Take a driver from the pool, starting one if there is spare capacity"""
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_spawn = self._created < self.size
+            if can_spawn:
+                self._created += 1
+        if can_spawn:
+            return self._spawn()
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No pooled driver became free within {timeout}s") from None
+
+    def release(self, driver, broken=False):
+        """Return a driver to the pool, recycling it if it is worn out or broken"""
+        uses = self._uses.get(id(driver), 0) + 1
+        self._uses[id(driver)] = uses
+
+        if not broken and not self._closed and uses < self.max_uses:
+            try:
+                self.reset(driver)
+                self._idle.put(driver)
+                return
+            except Exception as e:
+                print(f"⚠️ Could not reset pooled driver, recycling it: {str(e)}")
+
+        self._discard(driver)
+
+    def _discard(self, driver):
+        self._uses.pop(id(driver), None)
+        with self._lock:
+            self._created -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def reset(driver):
+        """Clear per-search state so the next search starts fresh"""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        try:
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except WebDriverException:
+            pass  # Pages without storage access, e.g. about:blank
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Borrow a driver for the duration of a with-block"""
+        driver = self.acquire(timeout=timeout)
+        broken = False
+        try:
+            yield driver
+        except Exception as e:
+            broken = driver_broken(e)
+            raise
+        finally:
+            self.release(driver, broken=broken)
+
+    def close(self):
+        """Quit every idle driver; drivers still in use are quit on release"""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,295 +1,494 @@
-from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
-import time
-from datetime import datetime
+from datetime import datetime, date
 import json
+import argparse
+from html_extractor import PageSnapshot, SelectorSet
+from waits import ReadinessWaiter
+from search_url import build_search_url
+from driver_pool import chrome_options, launch_driver, driver_broken
+from browser_profile import BLOCKED_URL_PATTERNS, bytes_transferred, format_bytes
+from models import Flight
+from search_cache import cache_key
+from selector_registry import default_registry
+from parsing import parse_price, parse_duration
+from network_capture import NetworkCapture, enable_performance_log
+from payload_decoder import decode_flights
+from tracing import traced, span, annotate, default_tracer
+
+# Result card selectors, compiled once and matched in a single pass
+FLIGHT_SELECTORS = SelectorSet([
+    "li[class*='pIav2d']",
+    "div[jscontroller='QyLbse']",
+    "div[class*='yR1fYc']",
+    "div[role='listitem']"
+])
+
+# Candidate selectors for each search form control, best-first order is learned
+TRIP_SELECTORS = [
+    "//div[@role='radiogroup']//div[contains(@aria-label,'One way')]",
+    "//span[contains(text(),'One way')]",
+    "//div[contains(text(),'One way')]",
+    "//button[contains(@aria-label,'One way')]"
+]
+
+ORIGIN_SELECTORS = [
+    "//input[@aria-label='Where from?']",
+    "//input[@placeholder='Where from?']",
+    "//input[contains(@aria-label,'origin')]",
+    "(//input[@type='text'])[1]"
+]
+
+DEST_SELECTORS = [
+    "//input[@aria-label='Where to?']",
+    "//input[@placeholder='Where to?']",
+    "//input[contains(@aria-label,'destination')]",
+    "(//input[@type='text'])[2]"
+]
+
+DATE_SELECTORS = [
+    "//input[@placeholder='Departure']",
+    "//input[contains(@aria-label,'Departure')]",
+    "//div[contains(@aria-label,'Departure')]",
+    "(//input[@type='text'])[3]"
+]
+
+RETURN_DATE_SELECTORS = [
+    "//input[@placeholder='Return']",
+    "//input[contains(@aria-label,'Return')]",
+    "(//input[@type='text'])[4]"
+]
+
+# Buttons that close the date picker
+DONE_SELECTORS = [
+    "//button[contains(@aria-label,'Done')]",
+    "//button[contains(text(),'Done')]"
+]
+
+SEARCH_SELECTORS = [
+    "//button[contains(@aria-label,'Search')]",
+    "//button[contains(text(),'Search')]",
+    "//button[contains(@aria-label,'Done')]",
+    "//button[contains(text(),'Done')]",
+    "//button[@jsname='vLv7Lb']"
+]
+
+# Autocomplete suggestions shown after typing an airport
+SUGGESTION_SELECTORS = [
+    "ul[role='listbox'] li",
+    "div[role='option']"
+]
+
+PRICE_SELECTORS = SelectorSet([
+    "span[aria-label*='dollars']",
+    "span:contains('$')",
+    "div[class='FpEdX'] span"
+])
+
+DURATION_SELECTORS = SelectorSet([
+    "div[class*='Ak5kof']",
+    "div[aria-label*='Total duration']",
+    "span:contains('hr')"
+])
 
 class GoogleFlightsScraper:
-    def __init__(self, headless=False):
-        """Initialize the scraper with Chrome options"""
+    def __init__(self, headless=False, pool=None, interactive=True, cache=None, selectors=None,
+                 capture=False, lean=False, debug=None, pool_timeout=None):
+        """Initialize the scraper with Chrome options
+
+        Pass a DriverPool to borrow warm browsers instead of starting one per search.
+        With interactive=False the browser is released without waiting for Enter.
+        Pass a SearchCache to reuse recent results for identical searches.
+        Selector hit rates are tracked in the shared SelectorRegistry by default.
+        With capture=True flights are decoded from the results data responses,
+        falling back to the rendered page (pooled drivers need enable_performance_log).
+        lean=True blocks images, fonts, media and third-party hosts; screenshots
+        are then only saved with debug=True. pool_timeout bounds the wait for
+        a free pooled driver.
+        """
         self.service = Service('./chromedriver.exe')
-        self.options = webdriver.ChromeOptions()
-        
         # Add options to avoid detection
-        self.options.add_argument('--disable-blink-features=AutomationControlled')
-        self.options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        self.options.add_experimental_option('useAutomationExtension', False)
-        self.options.add_argument('--disable-gpu')
-        self.options.add_argument('--no-sandbox')
-        self.options.add_argument('--disable-dev-shm-usage')
-        
-        if headless:
-            self.options.add_argument('--headless')
+        self.options = chrome_options(headless, lean)
+        self.blocked_urls = BLOCKED_URL_PATTERNS if lean else None
+        self.debug = debug if debug is not None else not lean
+        self.pool = pool
+        self.pool_timeout = pool_timeout
+        self.interactive = interactive
+        self.cache = cache
+        self.selectors = selectors if selectors is not None else default_registry
+        self.capture = capture
+        if capture:
+            enable_performance_log(self.options)
         
         self.driver = None
-        self.wait = None
+        self.network = None
+        self.waiter = None
     
+    @traced("start_driver")
     def start_driver(self):
-        """Start the Chrome driver"""
-        self.driver = webdriver.Chrome(service=self.service, options=self.options)
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        self.wait = WebDriverWait(self.driver, 20)
-        self.driver.maximize_window()
+        """Start the Chrome driver, or borrow one from the pool"""
+        if self.pool:
+            self.driver = self.pool.acquire(timeout=self.pool_timeout)
+        else:
+            self.driver = launch_driver(self.service, self.options, self.blocked_urls)
+        self.waiter = ReadinessWaiter(self.driver, timeout=20)
+        if self.capture:
+            self.network = NetworkCapture(self.driver)
+            self.network.clear()
+    
+    def reset_session(self):
+        """Start fresh timings and response capture for the next search on an open driver"""
+        self.waiter = ReadinessWaiter(self.driver, timeout=20)
+        if self.network:
+            self.network.clear()
+    
+    def __enter__(self):
+        """Start the driver for a series of searches; it is always released on exit"""
+        self.start_driver()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close_driver(broken=exc_type is not None)
     
-    def close_driver(self):
-        """Close the Chrome driver"""
+    def close_driver(self, broken=False):
+        """Close the Chrome driver, or hand it back to the pool"""
         if self.driver:
-            self.driver.quit()
+            if self.pool:
+                self.pool.release(self.driver, broken=broken)
+            else:
+                self.driver.quit()
+            self.driver = None
+        if not self.pool:
+            # Pooled runs save once at the end instead (BatchRunner, Scheduler)
+            self.selectors.save()
+            default_tracer.write_metrics()
     
-    def search_flights(self, origin, destination, departure_date, return_date=None):
-        """Search for flights and extract data"""
+    @traced("search_flights")
+    def search_flights(self, origin, destination, departure_date, return_date=None,
+                       adults=1, cabin="economy", use_deep_link=True):
+        """Search for flights and extract data
+
+        Opens a deep-link results URL directly; the interactive form is only
+        used if that page does not show any results. If the driver is already
+        started (see start_driver) it is reused and left open afterwards.
+        """
         print(f"🔍 Searching flights from {origin} to {destination} on {departure_date}")
+        annotate(origin=origin, destination=destination, departure_date=departure_date)
         
-        self.start_driver()
+        key = cache_key(origin, destination, departure_date, return_date, cabin, adults)
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                print("🗃️ Using cached results")
+                annotate(cached=True)
+                return dict(cached, cached=True)
+        
+        # A driver started by the caller stays open for further searches
+        owns_driver = self.driver is None
+        if owns_driver:
+            self.start_driver()
+        else:
+            self.reset_session()
+        broken = False
         
         try:
-            # Go to Google Flights with a more specific URL
-            url = f"https://www.google.com/travel/flights/search?tfs=CBwQAhoeagwIAxIIL20vMDJfMjg2EgoyMDI0LTAzLTE1cgcIARIDTEFYcAGCAQsI____________AUABSAGYAAQ&tfu=CnRDalJJWTJKbVNVMXJOMU5uY1VGQmRIbEJSeTFDUlVGQlFVRkJRVUZ2WTBsVFFVRkJFZ2t5TlRjc01qWTNOaG9MQ0xIWEF4QUNHZ05WVTBRNElCb0xDSy1iQXhBQ0dnTlZVMFE0SUFFb0EySUNDQVE9Gg0Ikc0BEgkvbS8wNWZzeg"
+            results_loaded = False
+            flights, source = [], "dom"
+            if use_deep_link:
+                url = build_search_url(origin, destination, departure_date, return_date,
+                                       adults=adults, cabin=cabin)
+                print(f"🔗 Opening results URL: {url}")
+                with span("navigate"):
+                    self.driver.get(url)
+                if self.network:
+                    source, flights = self.capture_flights()
+                if not flights:
+                    results_loaded = self.waiter.results_loaded(
+                        self.selectors.ordered("flight_cards", [s.source for s in FLIGHT_SELECTORS]),
+                        step="deep_link_results"
+                    ) is not None
+                    if not results_loaded:
+                        print("⚠️ Deep link showed no results, falling back to the search form")
             
-            self.driver.get("https://www.google.com/travel/flights")
-            time.sleep(3)
-            
-            # Debug: Print current URL
-            print(f"📍 Current URL: {self.driver.current_url}")
-            
-            # Try multiple selectors for the trip type
-            trip_selectors = [
-                "//div[@role='radiogroup']//div[contains(@aria-label,'One way')]",
-                "//span[contains(text(),'One way')]",
-                "//div[contains(text(),'One way')]",
-                "//button[contains(@aria-label,'One way')]"
-            ]
-            
-            for selector in trip_selectors:
-                try:
-                    print(f"🔍 Trying selector: {selector}")
-                    trip_type = self.driver.find_element(By.XPATH, selector)
-                    trip_type.click()
-                    print("✅ Successfully clicked 'One way'")
-                    time.sleep(1)
-                    break
-                except:
-                    continue
-            
-            # Try multiple selectors for origin input
-            origin_selectors = [
-                "//input[@aria-label='Where from?']",
-                "//input[@placeholder='Where from?']",
-                "//input[contains(@aria-label,'origin')]",
-                "(//input[@type='text'])[1]"
-            ]
-            
-            origin_clicked = False
-            for selector in origin_selectors:
-                try:
-                    print(f"🔍 Trying origin selector: {selector}")
-                    origin_input = self.driver.find_element(By.XPATH, selector)
-                    origin_input.click()
-                    time.sleep(1)
-                    origin_input.clear()
-                    origin_input.send_keys(origin)
-                    time.sleep(2)
-                    origin_input.send_keys(Keys.ENTER)
-                    print(f"✅ Successfully entered origin: {origin}")
-                    origin_clicked = True
-                    time.sleep(2)
-                    break
-                except Exception as e:
-                    print(f"❌ Failed with selector {selector}: {str(e)}")
-                    continue
-            
-            if not origin_clicked:
-                print("⚠️ Could not find origin input field")
-            
-            # Try destination input
-            dest_selectors = [
-                "//input[@aria-label='Where to?']",
-                "//input[@placeholder='Where to?']",
-                "//input[contains(@aria-label,'destination')]",
-                "(//input[@type='text'])[2]"
-            ]
-            
-            dest_clicked = False
-            for selector in dest_selectors:
-                try:
-                    print(f"🔍 Trying destination selector: {selector}")
-                    dest_input = self.driver.find_element(By.XPATH, selector)
-                    dest_input.click()
-                    time.sleep(1)
-                    dest_input.clear()
-                    dest_input.send_keys(destination)
-                    time.sleep(2)
-                    dest_input.send_keys(Keys.ENTER)
-                    print(f"✅ Successfully entered destination: {destination}")
-                    dest_clicked = True
-                    time.sleep(2)
-                    break
-                except:
-                    continue
-            
-            if not dest_clicked:
-                print("⚠️ Could not find destination input field")
-            
-            # Date selection
-            date_selectors = [
-                "//input[@placeholder='Departure']",
-                "//input[contains(@aria-label,'Departure')]",
-                "//div[contains(@aria-label,'Departure')]",
-                "(//input[@type='text'])[3]"
-            ]
-            
-            for selector in date_selectors:
-                try:
-                    print(f"🔍 Trying date selector: {selector}")
-                    date_input = self.driver.find_element(By.XPATH, selector)
-                    date_input.click()
-                    print("✅ Clicked on date field")
-                    time.sleep(1)
-                    break
-                except:
-                    continue
-            
-            print("📅 Please manually select your departure date in the browser")
-            print("⏰ You have 15 seconds to select the date and click Done...")
-            time.sleep(15)
-            
-            # Click search button
-            search_selectors = [
-                "//button[contains(@aria-label,'Search')]",
-                "//button[contains(text(),'Search')]",
-                "//button[contains(@aria-label,'Done')]",
-                "//button[contains(text(),'Done')]",
-                "//button[@jsname='vLv7Lb']"
-            ]
-            
-            for selector in search_selectors:
-                try:
-                    search_button = self.driver.find_element(By.XPATH, selector)
-                    search_button.click()
-                    print("✅ Clicked search/done button")
-                    break
-                except:
-                    continue
-            
-            # Wait for results
-            print("⌛ Waiting for results to load...")
-            time.sleep(8)
-            
-            # Take a screenshot for debugging
-            self.driver.save_screenshot("flight_results.png")
-            print("📸 Screenshot saved as 'flight_results.png'")
+            if not flights and not results_loaded:
+                self.fill_search_form(origin, destination, departure_date, return_date)
+                
+                # Wait for results
+                print("⌛ Waiting for results to load...")
+                self.waiter.results_loaded(
+                    self.selectors.ordered("flight_cards", [s.source for s in FLIGHT_SELECTORS])
+                )
             
-            # Extract flight data
-            flights = self.extract_flight_data()
+            if not flights:
+                self.waiter.network_idle(timeout=5)
+                
+                # Take a screenshot for debugging
+                if self.debug:
+                    self.driver.save_screenshot("flight_results.png")
+                    print("📸 Screenshot saved as 'flight_results.png'")
+                
+                # Extract flight data
+                flights = self.extract_flight_data()
+            self.waiter.print_timings()
+            transferred = bytes_transferred(self.driver)
+            print(f"📦 Transferred {format_bytes(transferred)}")
+            annotate(source=source, flights=len(flights), bytes_transferred=transferred)
             
-            return {
+            result = {
                 "status": "success",
                 "origin": origin,
                 "destination": destination,
                 "departure_date": departure_date,
                 "flights_found": len(flights),
-                "flights": flights
+                "flights": flights,
+                "source": source,
+                "timings": self.waiter.timings,
+                "bytes_transferred": transferred
             }
+            if self.cache:
+                self.cache.put(key, result)
+            return result
             
         except Exception as e:
             print(f"❌ Error during search: {str(e)}")
+            broken = driver_broken(e)
             # Take a screenshot on error
-            self.driver.save_screenshot("error_screenshot.png")
-            print("📸 Error screenshot saved as 'error_screenshot.png'")
+            if self.debug:
+                try:
+                    self.driver.save_screenshot("error_screenshot.png")
+                    print("📸 Error screenshot saved as 'error_screenshot.png'")
+                except Exception:
+                    broken = True
             return {
                 "status": "error",
                 "error": str(e)
             }
         finally:
-            print("🔄 Press Enter to close the browser...")
-            input()  # This will pause before closing so you can see what happened
-            self.close_driver()
+            if owns_driver:
+                if self.interactive:
+                    print("🔄 Press Enter to close the browser...")
+                    input()  # This will pause before closing so you can see what happened
+                self.close_driver(broken=broken)
+            elif broken:
+                self.close_driver(broken=True)
     
-    def extract_flight_data(self):
-        """Extract flight information from the results page"""
-        flights = []
+    @traced("capture_flights")
+    def capture_flights(self, timeout=10):
+        """Decode flights from the captured results responses or the page's inline data
         
-        # Try multiple selectors for flight elements
-        flight_selectors = [
-            "//li[contains(@class,'pIav2d')]",
-            "//div[@jscontroller='QyLbse']",
-            "//div[contains(@class,'yR1fYc')]",
-            "//div[@role='listitem']"
-        ]
+        Returns (source, flights); flights is empty if neither has arrived
+        within timeout, in which case the rendered cards are parsed instead.
+        """
+        flights = self.network.collect()
+        source = "network"
+        if not flights:
+            flights = decode_flights(self.driver.page_source)
+            source = "page_data"
+        if not flights:
+            flights = self.waiter.payload_decoded(self.network, timeout=timeout) or []
+            source = "network"
         
-        flight_elements = []
-        for selector in flight_selectors:
-            try:
-                elements = self.driver.find_elements(By.XPATH, selector)
-                if elements:
-                    flight_elements = elements
-                    print(f"✅ Found {len(elements)} flights using selector: {selector}")
-                    break
-            except:
-                continue
+        extracted_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for flight in flights:
+            flight.extracted_at = extracted_at
+        for flight in flights[:5]:
+            print(f"✈️ Flight {flight.index}: {flight.summary()}")
+        if flights:
+            print(f"📡 Decoded {len(flights)} flights from the {source.replace('_', ' ')}")
+        annotate(source=source, flights=len(flights))
+        return source, flights
+    
+    @traced("fill_search_form")
+    def fill_search_form(self, origin, destination, departure_date=None, return_date=None):
+        """Fill in the search form step by step (fallback for deep links)
+        
+        Each field has several candidate selectors; the registry tries the
+        one that worked best on earlier runs first. Dates are typed in; the
+        manual date picker is only offered in interactive mode.
+        """
+        self.driver.get("https://www.google.com/travel/flights")
+        self.waiter.page_loaded()
+        
+        # Debug: Print current URL
+        print(f"📍 Current URL: {self.driver.current_url}")
+        
+        def click(selector):
+            self.driver.find_element(By.XPATH, selector).click()
+            return True
+        
+        def type_airport(step, code):
+            def action(selector):
+                field = self.driver.find_element(By.XPATH, selector)
+                field.click()
+                field.clear()
+                field.send_keys(code)
+                self.waiter.any_present(SUGGESTION_SELECTORS, step=step, timeout=5)
+                field.send_keys(Keys.ENTER)
+                return True
+            return action
+        
+        # Trip type
+        if not return_date:
+            selector, _ = self.selectors.attempt("trip_type", TRIP_SELECTORS, click)
+            if selector:
+                print(f"✅ Successfully clicked 'One way' ({selector})")
+        
+        # Origin input
+        selector, _ = self.selectors.attempt("origin_input", ORIGIN_SELECTORS,
+                                             type_airport("origin_suggestions", origin))
+        if selector:
+            print(f"✅ Successfully entered origin: {origin} ({selector})")
+        else:
+            print("⚠️ Could not find origin input field")
+        
+        # Destination input
+        selector, _ = self.selectors.attempt("destination_input", DEST_SELECTORS,
+                                             type_airport("destination_suggestions", destination))
+        if selector:
+            print(f"✅ Successfully entered destination: {destination} ({selector})")
+        else:
+            print("⚠️ Could not find destination input field")
+        
+        # Date selection
+        dates_entered = departure_date is not None and self.enter_dates(departure_date, return_date)
+        if not dates_entered and self.interactive:
+            selector, _ = self.selectors.attempt("date_input", DATE_SELECTORS, click)
+            if selector:
+                print(f"✅ Clicked on date field ({selector})")
+            
+            print("📅 Please manually select your departure date in the browser")
+            print("⏰ You have 15 seconds to select the date and click Done...")
+            # Continue as soon as the date picker is closed
+            self.waiter.any_present(["div[role='dialog']"], step="date_picker_open", timeout=2)
+            self.waiter.gone("div[role='dialog']", step="date_selection", timeout=15)
+        elif not dates_entered:
+            print("⚠️ Could not enter the travel dates")
+        
+        # Click search button
+        selector, _ = self.selectors.attempt("search_button", SEARCH_SELECTORS, click)
+        if selector:
+            print(f"✅ Clicked search/done button ({selector})")
+    
+    def enter_dates(self, departure_date, return_date=None):
+        """Type the travel dates into the date fields and close the picker; returns success"""
+        def type_date(value):
+            text = date.fromisoformat(str(value)).strftime("%b %d, %Y")
+            
+            def action(selector):
+                field = self.driver.find_element(By.XPATH, selector)
+                field.click()
+                field.send_keys(Keys.CONTROL, "a")
+                field.send_keys(text, Keys.ENTER)
+                return True
+            return action
+        
+        selector, _ = self.selectors.attempt("date_input", DATE_SELECTORS, type_date(departure_date))
+        if not selector:
+            return False
+        print(f"✅ Entered departure date: {departure_date} ({selector})")
+        
+        if return_date:
+            selector, _ = self.selectors.attempt("return_date_input", RETURN_DATE_SELECTORS, type_date(return_date))
+            if not selector:
+                return False
+            print(f"✅ Entered return date: {return_date} ({selector})")
+        
+        # Typing may leave the date picker open
+        if self.waiter.gone("div[role='dialog']", step="date_picker_closed", timeout=1) is None:
+            self.selectors.attempt(
+                "date_done", DONE_SELECTORS,
+                lambda selector: self.driver.find_element(By.XPATH, selector).click() or True
+            )
+        return True
+    
+    @traced("extract_flight_data")
+    def extract_flight_data(self, html=None):
+        """Extract flight information from the results page
+
+        The page source is fetched once and parsed offline, so each card
+        costs no WebDriver round-trips. Pass ``html`` to re-parse a saved page.
+        """
+        flights = list(self.iter_flight_data(html))
+        annotate(flights=len(flights))
+        return flights
+    
+    def iter_flight_data(self, html=None, verbose=True):
+        """Yield flights one by one as their cards are parsed, for streaming consumers"""
+        if html is None:
+            snapshot = PageSnapshot.from_driver(self.driver)
+        else:
+            snapshot = PageSnapshot(html)
+        
+        ordered = self.selectors.ordered("flight_cards", [s.source for s in FLIGHT_SELECTORS])
+        selector, flight_elements = snapshot.first_match(SelectorSet(ordered))
+        self.selectors.record_winner("flight_cards", ordered, selector)
+        annotate(selector=selector, cards=len(flight_elements))
         
         if not flight_elements:
             print("❌ No flight elements found")
-            return flights
+            return
+        
+        print(f"✅ Found {len(flight_elements)} flights using selector: {selector}")
         
         for i, flight in enumerate(flight_elements[:5]):
             try:
-                flight_data = {"index": i + 1}
-                
-                # Try to extract price
-                price_selectors = [
-                    ".//span[contains(@aria-label,'dollars')]",
-                    ".//span[contains(text(),'$')]",
-                    ".//div[@class='FpEdX']//span"
-                ]
-                
-                for selector in price_selectors:
-                    try:
-                        price = flight.find_element(By.XPATH, selector).text
-                        if price:
-                            flight_data["price"] = price
-                            break
-                    except:
-                        continue
-                
-                # Try to extract duration
-                duration_selectors = [
-                    ".//div[contains(@class,'Ak5kof')]",
-                    ".//div[contains(@aria-label,'Total duration')]",
-                    ".//span[contains(text(),'hr')]"
-                ]
+                flight_data = Flight.from_text(
+                    flight.text,
+                    index=i + 1,
+                    extracted_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                )
                 
-                for selector in duration_selectors:
-                    try:
-                        duration = flight.find_element(By.XPATH, selector).text
-                        if duration:
-                            flight_data["duration"] = duration
-                            break
-                    except:
-                        continue
+                # Prefer the dedicated price/duration elements over the card text
+                price = self._first_text(flight, "price", PRICE_SELECTORS)
+                if price and parse_price(price)[0] is not None:
+                    flight_data.price_cents, flight_data.currency = parse_price(price)
                 
-                # Add timestamp
-                flight_data["extracted_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                duration = self._first_text(flight, "duration", DURATION_SELECTORS)
+                if duration and parse_duration(duration) is not None:
+                    flight_data.duration_minutes = parse_duration(duration)
                 
-                if flight_data.get("price") or flight_data.get("duration"):
-                    flights.append(flight_data)
-                    print(f"✈️ Flight {i+1}: {flight_data}")
-                    
             except Exception as e:
                 print(f"⚠️ Error extracting flight {i+1}: {str(e)}")
                 continue
+            
+            if flight_data.price_cents is not None or flight_data.duration_minutes is not None:
+                if verbose:
+                    print(f"✈️ Flight {i+1}: {flight_data.summary()}")
+                yield flight_data
+    
+    def _first_text(self, card, group, selector_set):
+        """Return the text of the first selector that yields a non-empty match"""
+        def text_of(selector):
+            node = card.select_first(selector)
+            return node.text if node is not None else None
         
-        return flights
+        _, text = self.selectors.attempt(group, [s.source for s in selector_set], text_of)
+        return text
 
 # Test the scraper
 if __name__ == "__main__":
-    scraper = GoogleFlightsScraper(headless=False)
-    result = scraper.search_flights("JFK", "LAX", "2024-03-15")
+    parser = argparse.ArgumentParser(description="Search Google Flights for one route")
+    parser.add_argument("origin", nargs="?", default="JFK")
+    parser.add_argument("destination", nargs="?", default="LAX")
+    parser.add_argument("departure_date", nargs="?", default="2024-03-15")
+    parser.add_argument("--return-date")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run unattended: no browser window and no prompts; prints JSON")
+    parser.add_argument("--capture", action="store_true", help="Decode results from network responses")
+    args = parser.parse_args()
+    
+    if args.headless:
+        with GoogleFlightsScraper(headless=True, interactive=False, lean=True, capture=args.capture) as scraper:
+            result = scraper.search_flights(args.origin, args.destination, args.departure_date, args.return_date)
+        print(json.dumps(result, default=Flight.to_dict))
+        raise SystemExit(0 if result["status"] == "success" else 1)
+    
+    scraper = GoogleFlightsScraper(headless=False, capture=args.capture)
+    result = scraper.search_flights(args.origin, args.destination, args.departure_date, args.return_date)
     
     print("\n" + "="*50)
     print("SEARCH RESULTS:")
-    print("="*50)
\ No newline at end of file
+    print("="*50)
+    for flight in result.get("flights", []):
+        print(f"✈️ {flight.summary()}")
@@ -0,0 +1,320 @@
+import re
+from html.parser import HTMLParser
+
+# Elements whose boundaries render as line breaks in WebElement.text
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4',
+    'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section',
+    'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'tr', 'ul'
+}
+
+# Elements that never contribute visible text
+SKIP_TAGS = {'script', 'style', 'template', 'noscript', 'svg', 'head', 'title'}
+
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'source', 'track', 'wbr'
+}
+
+_WHITESPACE = re.compile(r'[ \t\r\n\f]+')
+_HIDDEN_STYLE = re.compile(r'display\s*:\s*none|visibility\s*:\s*hidden')
+
+
+class Node:
+    """A parsed HTML element with just enough structure for card extraction"""
+    __slots__ = ('tag', 'attrs', 'parent', 'children', '_text', '_own_text')
+
+    def __init__(self, tag, attrs, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children = []
+        self._text = None
+        self._own_text = None
+
+    def get(self, name, default=None):
+        return self.attrs.get(name, default)
+
+    @property
+    def hidden(self):
+        return (self.tag in SKIP_TAGS
+                or 'hidden' in self.attrs
+                or bool(_HIDDEN_STYLE.search(self.attrs.get('style', ''))))
+
+    @property
+    def own_text(self):
+        """Text of the direct text children, like XPath text()"""
+        if self._own_text is None:
+            parts = [child for child in self.children if isinstance(child, str)]
+            self._own_text = _WHITESPACE.sub(' ', ''.join(parts)).strip()
+        return self._own_text
+
+    @property
+    def text(self):
+        """Rendered text, approximating Selenium's WebElement.text"""
+        if self._text is None:
+            chunks = []
+            self._collect_text(chunks)
+            lines = (_WHITESPACE.sub(' ', line).strip() for line in ''.join(chunks).split('\n'))
+            self._text = '\n'.join(line for line in lines if line)
+        return self._text
+
+    def _collect_text(self, chunks):
+        if self.hidden:
+            return
+        block = self.tag in BLOCK_TAGS
+        if block:
+            chunks.append('\n')
+        for child in self.children:
+            if isinstance(child, str):
+                chunks.append(child)
+            else:
+                child._collect_text(chunks)
+        if block:
+            chunks.append('\n')
+
+    def iter_elements(self):
+        """Yield every descendant element in document order"""
+        stack = [child for child in reversed(self.children) if not isinstance(child, str)]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(child for child in reversed(node.children) if not isinstance(child, str))
+
+    def select(self, selector):
+        """Return descendants matching a selector (string or compiled)"""
+        if isinstance(selector, str):
+            selector = compile_selector(selector)
+        return [node for node in self.iter_elements() if selector.matches(node, scope=self)]
+
+    def select_first(self, selector):
+        if isinstance(selector, str):
+            selector = compile_selector(selector)
+        for node in self.iter_elements():
+            if selector.matches(node, scope=self):
+                return node
+        return None
+
+
+class _TreeBuilder(HTMLParser):
+    """Build a Node tree from page source in a single pass"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node('#document', {})
+        self.current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {name: (value if value is not None else '') for name, value in attrs}, self.current)
+        self.current.children.append(node)
+        if tag not in VOID_TAGS:
+            self.current = node
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.current = self.current.parent
+
+    def handle_endtag(self, tag):
+        # Walk up to the matching open tag, tolerating unclosed children
+        node = self.current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+
+# ---------------------------------------------------------------------------
+# Selectors
+# ---------------------------------------------------------------------------
+
+_TOKEN = re.compile(r"""
+    \s*(?P<combinator>>)\s*
+  | (?P<space>\s+)
+  | (?P<tag>[a-zA-Z][\w-]*|\*)
+  | \.(?P<cls>[\w-]+)
+  | \[\s*(?P<attr>[\w:-]+)\s*(?:(?P<op>[*^$]?=)\s*(?P<quote>['"])(?P<value>.*?)(?P=quote))?\s*\]
+  | :contains\(\s*(?P<cquote>['"])(?P<contains>.*?)(?P=cquote)\s*\)
+""", re.VERBOSE)
+
+
+class _Compound:
+    """One compound selector, e.g. li[class*='pIav2d']"""
+    __slots__ = ('tag', 'tests')
+
+    def __init__(self):
+        self.tag = None
+        self.tests = []
+
+    def matches(self, node):
+        if self.tag and node.tag != self.tag:
+            return False
+        return all(test(node) for test in self.tests)
+
+
+def _attr_test(name, op, value):
+    if op is None:
+        return lambda node: name in node.attrs
+    if op == '=':
+        return lambda node: node.attrs.get(name) == value
+    if op == '*=':
+        return lambda node: value in node.attrs.get(name, '')
+    if op == '^=':
+        return lambda node: node.attrs.get(name, '').startswith(value)
+    return lambda node: node.attrs.get(name, '').endswith(value)
+
+
+class Selector:
+    """A compiled CSS-style selector
+
+    Supports tag, *, .class, [attr], [attr='v'], [attr*='v'], [attr^='v'],
+    [attr$='v'], :contains('text') on the element's own text, and the
+    descendant and child (>) combinators.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.parts = []  # [(combinator_to_previous, compound), ...]
+        self._parse(source)
+
+    def _parse(self, source):
+        compound = None
+        combinator = None
+        pos = 0
+        source = source.strip()
+        while pos < len(source):
+            match = _TOKEN.match(source, pos)
+            if not match or match.end() == pos:
+                raise ValueError(f"Unsupported selector syntax at {pos}: {source!r}")
+            pos = match.end()
+            if match.group('combinator') or match.group('space'):
+                if compound is not None:
+                    self.parts.append((combinator, compound))
+                    compound = None
+                combinator = '>' if match.group('combinator') else ' '
+                continue
+            if compound is None:
+                compound = _Compound()
+            if match.group('tag'):
+                compound.tag = None if match.group('tag') == '*' else match.group('tag').lower()
+            elif match.group('cls'):
+                cls = match.group('cls')
+                compound.tests.append(lambda node, cls=cls: cls in node.attrs.get('class', '').split())
+            elif match.group('attr'):
+                compound.tests.append(_attr_test(match.group('attr'), match.group('op'), match.group('value')))
+            else:
+                needle = match.group('contains')
+                compound.tests.append(lambda node, needle=needle: needle in node.own_text)
+        if compound is None:
+            raise ValueError(f"Empty selector: {source!r}")
+        self.parts.append((combinator, compound))
+
+    def matches(self, node, scope=None):
+        """Check node against the selector, keeping ancestors inside scope"""
+        return self._match_from(node, len(self.parts) - 1, scope)
+
+    def _match_from(self, node, index, scope):
+        combinator, compound = self.parts[index]
+        if not compound.matches(node):
+            return False
+        if index == 0:
+            return True
+        ancestor = node.parent
+        if combinator == '>':
+            if ancestor is None or ancestor is scope:
+                return False
+            return self._match_from(ancestor, index - 1, scope)
+        while ancestor is not None and ancestor is not scope:
+            if self._match_from(ancestor, index - 1, scope):
+                return True
+            ancestor = ancestor.parent
+        return False
+
+    def __repr__(self):
+        return f"Selector({self.source!r})"
+
+
+_compiled = {}
+
+
+def compile_selector(source):
+    """Compile a selector string, reusing earlier compilations"""
+    selector = _compiled.get(source)
+    if selector is None:
+        selector = _compiled[source] = Selector(source)
+    return selector
+
+
+class SelectorSet:
+    """An ordered group of compiled selectors matched in one tree walk"""
+
+    def __init__(self, selectors):
+        self.selectors = [compile_selector(s) if isinstance(s, str) else s for s in selectors]
+
+    def __iter__(self):
+        return iter(self.selectors)
+
+    def __len__(self):
+        return len(self.selectors)
+
+    def match(self, root):
+        """Return {selector source: [nodes]} for every selector, walking root once"""
+        buckets = {selector.source: [] for selector in self.selectors}
+        for node in root.iter_elements():
+            for selector in self.selectors:
+                if selector.matches(node, scope=root):
+                    buckets[selector.source].append(node)
+        return buckets
+
+    def first(self, root):
+        """Return the first node matching any selector, in selector priority order"""
+        for selector in self.selectors:
+            node = root.select_first(selector)
+            if node is not None:
+                return node
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Snapshots
+# ---------------------------------------------------------------------------
+
+class PageSnapshot:
+    """A parsed copy of a results page that can be queried without a browser"""
+
+    def __init__(self, html, url=None):
+        builder = _TreeBuilder()
+        builder.feed(html)
+        builder.close()
+        self.root = builder.root
+        self.url = url
+
+    @classmethod
+    def from_driver(cls, driver):
+        """Grab the page source once from a live WebDriver"""
+        return cls(driver.page_source, url=driver.current_url)
+
+    @classmethod
+    def from_file(cls, path, url=None):
+        with open(path, encoding='utf-8') as f:
+            return cls(f.read(), url=url)
+
+    def select(self, selector):
+        return self.root.select(selector)
+
+    def first_match(self, selector_set, accept=None):
+        """Return (selector, nodes) for the first selector whose matches are accepted
+
+        All selectors are evaluated in a single walk of the tree; the
+        priority order of the set decides which result wins.
+        """
+        buckets = selector_set.match(self.root)
+        for selector in selector_set:
+            nodes = buckets[selector.source]
+            if nodes and (accept is None or accept(nodes)):
+                return selector.source, nodes
+        return None, []
@@ -0,0 +1,117 @@
+from dataclasses import dataclass, asdict, fields
+from parsing import parse_card, parse_price, parse_duration, parse_stops, parse_times
+
+
+@dataclass(slots=True)
+class Flight:
+    """One flight result with normalized numeric fields
+
+    Prices are integer cents, durations whole minutes and times 24-hour
+    'HH:MM' strings, so they can be stored and aggregated as numbers.
+    """
+    index: int = None
+    price_cents: int = None
+    currency: str = None
+    duration_minutes: int = None
+    stops: int = None
+    airline: str = None
+    departure_time: str = None
+    arrival_time: str = None
+    arrival_day_offset: int = 0
+    details: str = None
+    raw_text: str = None
+    extracted_at: str = None
+
+    @property
+    def price(self):
+        """Price in whole currency units (e.g. dollars)"""
+        return None if self.price_cents is None else self.price_cents / 100
+
+    @property
+    def duration(self):
+        """Duration formatted like '5h 30m'"""
+        if self.duration_minutes is None:
+            return None
+        return f"{self.duration_minutes // 60}h {self.duration_minutes % 60}m"
+
+    @classmethod
+    def from_text(cls, text, index=None, airline=None, parser=None, **extra):
+        """Build a flight from a result card's text in one parsing pass"""
+        card = parser.parse(text) if parser else parse_card(text)
+        return cls.from_card(card, raw_text=text, index=index, airline=airline, **extra)
+
+    @classmethod
+    def from_card(cls, card, raw_text=None, index=None, airline=None, **extra):
+        """Build a flight from already parsed CardFields"""
+        return cls(
+            index=index,
+            price_cents=card.price_cents,
+            currency=card.currency,
+            duration_minutes=card.duration_minutes,
+            stops=card.stops,
+            airline=airline or card.airline,
+            departure_time=card.departure_time,
+            arrival_time=card.arrival_time,
+            arrival_day_offset=card.arrival_day_offset,
+            raw_text=raw_text,
+            **extra
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a flight from a stored dict, including legacy scraper dicts with display strings"""
+        if 'price_cents' in data or 'duration_minutes' in data:
+            names = {f.name for f in fields(cls)}
+            return cls(**{key: value for key, value in data.items() if key in names})
+
+        price = data.get('price', data.get('price_text'))
+        if isinstance(price, (int, float)):
+            price_cents, currency = round(price * 100), 'USD'
+        else:
+            price_cents, currency = parse_price(price)
+
+        stops = data.get('stops')
+        if not isinstance(stops, int):
+            stops = parse_stops(stops)
+
+        departure, arrival, offset = parse_times(data.get('raw_text') or data.get('times'))
+        airline = data.get('airline')
+        return cls(
+            index=data.get('index'),
+            price_cents=price_cents,
+            currency=currency,
+            duration_minutes=parse_duration(data.get('duration')),
+            stops=stops,
+            airline=None if airline == "N/A" else airline,
+            departure_time=data.get('departure', departure),
+            arrival_time=data.get('arrival', arrival),
+            arrival_day_offset=offset,
+            details=data.get('details'),
+            raw_text=data.get('raw_text', data.get('price_text')),
+            extracted_at=data.get('extracted_at')
+        )
+
+    @classmethod
+    def coerce(cls, value):
+        """Accept either a Flight or a dict"""
+        return value if isinstance(value, cls) else cls.from_dict(value)
+
+    def to_dict(self):
+        """Compact dict of the non-empty fields"""
+        return {key: value for key, value in asdict(self).items() if value is not None}
+
+    def stops_label(self):
+        if self.stops is None:
+            return "N/A"
+        if self.stops == 0:
+            return "Nonstop"
+        return f"{self.stops} stop" + ("s" if self.stops > 1 else "")
+
+    def summary(self):
+        """One-line human readable description"""
+        price = f"{self.price:,.2f} {self.currency}" if self.price_cents is not None else "N/A"
+        times = f"{self.departure_time} - {self.arrival_time}" if self.departure_time else "N/A"
+        if self.arrival_day_offset:
+            times += f" (+{self.arrival_day_offset})"
+        return (f"{price} | {times} | {self.duration or 'N/A'} | "
+                f"{self.airline or 'N/A'} | {self.stops_label()}")
@@ -0,0 +1,60 @@
+import base64
+import json
+
+from selenium.common.exceptions import WebDriverException
+
+from payload_decoder import decode_flights, is_results_url, merge_flights
+
+
+def enable_performance_log(options):
+    """Ask ChromeDriver to record DevTools network events in the 'performance' log"""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+
+class NetworkCapture:
+    """Decode flights from the results data responses a Selenium driver receives
+
+    Reads Network.* events from the driver's performance log (see
+    enable_performance_log) and fetches the body of each results response
+    over CDP as soon as it has finished loading.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.batches = []
+        self._results = set()
+
+    def _events(self):
+        for entry in self.driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            yield message['method'], message.get('params', {})
+
+    def clear(self):
+        """Forget earlier responses, e.g. from the previous search on a pooled driver"""
+        for _ in self._events():
+            pass
+        self.batches = []
+        self._results = set()
+
+    def _body(self, request_id):
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except WebDriverException:
+            return ''  # Evicted from the buffer or never had a body
+        body = result.get('body', '')
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        return body
+
+    def collect(self):
+        """Process new log entries and return every flight decoded so far"""
+        for method, params in self._events():
+            if method == 'Network.responseReceived' and is_results_url(params['response']['url']):
+                self._results.add(params['requestId'])
+            elif method == 'Network.loadingFinished' and params['requestId'] in self._results:
+                self._results.discard(params['requestId'])
+                flights = decode_flights(self._body(params['requestId']))
+                if flights:
+                    self.batches.append(flights)
+        return merge_flights(self.batches)
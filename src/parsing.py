@@ -0,0 +1,170 @@
+import json
+import re
+from collections import namedtuple
+
+CURRENCY_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "₹": "INR"}
+
+# Carriers recognised on US routes; extend with CarrierMatcher.from_file()
+DEFAULT_CARRIERS = [
+    'United', 'American', 'Delta', 'Southwest', 'JetBlue',
+    'Alaska', 'Spirit', 'Frontier', 'Hawaiian', 'Allegiant',
+    'Sun Country', 'Breeze'
+]
+
+_PRICE = r'(?P<symbol>[$€£¥₹])\s?(?P<whole>\d{1,3}(?:,\d{3})+|\d+)(?:\.(?P<cents>\d{2}))?'
+_CLOCK = r'(?P<hour>\d{1,2}):(?P<minute>\d{2})\s*(?P<meridiem>[AaPp][Mm])(?:\+(?P<offset>\d))?'
+_DURATION = (r'(?P<hours>\d+)\s*(?:hr|h)\b(?:\s*(?P<minutes>\d+)\s*(?:min|m)\b)?'
+             r'|(?P<only_minutes>\d+)\s*min\b')
+_STOPS = r'(?P<stops>\d+)\s+stops?\b|(?P<nonstop>[Nn]onstop)'
+
+PRICE_RE = re.compile(_PRICE)
+CLOCK_RE = re.compile(_CLOCK)
+DURATION_RE = re.compile(_DURATION)
+STOPS_RE = re.compile(_STOPS)
+
+CardFields = namedtuple('CardFields', [
+    'price_text', 'price_cents', 'currency',
+    'times', 'departure_time', 'arrival_time', 'arrival_day_offset',
+    'duration_minutes', 'stops', 'airline'
+])
+
+
+class CarrierMatcher:
+    """Find carrier names with one compiled alternation instead of a list scan"""
+
+    def __init__(self, carriers=DEFAULT_CARRIERS):
+        # Longest names first so 'Sun Country' wins over a shorter prefix
+        self.carriers = sorted(set(carriers), key=len, reverse=True)
+        self.pattern = '|'.join(re.escape(name) for name in self.carriers)
+        self.regex = re.compile(rf'\b(?:{self.pattern})\b')
+
+    @classmethod
+    def from_file(cls, path):
+        """Load carriers from a JSON list of names"""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def find(self, text):
+        match = self.regex.search(text)
+        return match.group(0) if match else None
+
+
+def _clock(match, offset_group='offset'):
+    """Convert a clock match to ('HH:MM' in 24-hour time, day offset)"""
+    hour = int(match.group('hour')) % 12 + (12 if match.group('meridiem').lower() == 'pm' else 0)
+    offset = match.group(offset_group)
+    return f"{hour:02d}:{match.group('minute')}", int(offset) if offset else 0
+
+
+def _price(match):
+    whole = int(match.group('whole').replace(',', ''))
+    cents = int(match.group('cents')) if match.group('cents') else 0
+    return whole * 100 + cents, CURRENCY_SYMBOLS[match.group('symbol')]
+
+
+def _duration(match):
+    if match.group('only_minutes'):
+        return int(match.group('only_minutes'))
+    return int(match.group('hours')) * 60 + int(match.group('minutes') or 0)
+
+
+class CardParser:
+    """Parse every field of a result card in a single regex pass"""
+
+    def __init__(self, carriers=None):
+        self.carriers = carriers if carriers is not None else CarrierMatcher()
+        # Only positions that can start a field are tried: digits, currency
+        # symbols, 'Nonstop' and carrier initials
+        starts = ''.join(sorted({re.escape(name[0]) for name in self.carriers.carriers} | {'N', 'n'}))
+        # Named alternatives; the first match of each kind wins
+        self.regex = re.compile(rf'(?=[\d$€£¥₹{starts}])(?:' + '|'.join([
+            f'(?P<price>{_PRICE})',
+            f'(?P<clock>{_CLOCK})',
+            f'(?P<duration>{_DURATION})',
+            f'(?P<stop>{_STOPS})',
+            rf'(?P<airline>\b(?:{self.carriers.pattern})\b)'
+        ]) + ')')
+
+    def parse(self, text):
+        price = None
+        clocks = []
+        duration = None
+        stops = None
+        airline = None
+
+        for match in self.regex.finditer(text or ''):
+            kind = match.lastgroup
+            if kind == 'price':
+                if price is None:
+                    price = match
+            elif kind == 'clock':
+                if len(clocks) < 2:
+                    clocks.append(match)
+            elif kind == 'duration':
+                if duration is None:
+                    duration = _duration(match)
+            elif kind == 'stop':
+                if stops is None:
+                    stops = 0 if match.group('nonstop') else int(match.group('stops'))
+            elif airline is None:
+                airline = match.group('airline')
+
+        price_cents, currency = _price(price) if price else (None, None)
+        departure, arrival, offset = None, None, 0
+        times = None
+        if len(clocks) == 2:
+            departure = _clock(clocks[0])[0]
+            arrival, offset = _clock(clocks[1])
+            times = f"{clocks[0].group('clock').split('+')[0]} - {clocks[1].group('clock').split('+')[0]}"
+
+        return CardFields(
+            price_text=price.group('price') if price else None,
+            price_cents=price_cents,
+            currency=currency,
+            times=times,
+            departure_time=departure,
+            arrival_time=arrival,
+            arrival_day_offset=offset,
+            duration_minutes=duration,
+            stops=stops,
+            airline=airline
+        )
+
+
+default_parser = CardParser()
+
+
+def parse_card(text):
+    """Parse all fields of a card's text with the default carrier table"""
+    return default_parser.parse(text)
+
+
+def parse_price(text):
+    """Return (cents, currency) for the first price in text, or (None, None)"""
+    match = PRICE_RE.search(text or '')
+    return _price(match) if match else (None, None)
+
+
+def parse_duration(text):
+    """Return total minutes for text like '7 hr 13 min', '5h 30m' or '45 min'"""
+    match = DURATION_RE.search(text or '')
+    return _duration(match) if match else None
+
+
+def parse_stops(text):
+    """Return the number of stops, 0 for nonstop, or None if unknown"""
+    match = STOPS_RE.search(text or '')
+    if not match:
+        return None
+    return 0 if match.group('nonstop') else int(match.group('stops'))
+
+
+def parse_times(text):
+    """Return (departure, arrival, arrival day offset) from a card's text"""
+    clocks = []
+    for match in CLOCK_RE.finditer(text or ''):
+        clocks.append(match)
+        if len(clocks) == 2:
+            arrival, offset = _clock(match)
+            return _clock(clocks[0])[0], arrival, offset
+    return None, None, 0
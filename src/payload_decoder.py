@@ -0,0 +1,162 @@
+import json
+import re
+from datetime import date
+
+from models import Flight
+
+# Prefix Google prepends to JSON responses to stop them being run as scripts
+XSSI_PREFIX = ")]}'"
+
+# Inline page data, e.g. AF_initDataCallback({key: 'ds:1', hash: '2', data:[...], sideChannel: {}});
+_INIT_DATA = re.compile(r"AF_initDataCallback\(\{.*?data:(\[.*?\]), sideChannel:", re.DOTALL)
+
+# URL fragments of the results data responses
+RESULTS_URL_MARKERS = ("GetShoppingResults", "FlightsFrontendService", "batchexecute")
+
+
+def is_results_url(url):
+    return any(marker in url for marker in RESULTS_URL_MARKERS)
+
+
+def _json_chunks(body):
+    """Yield every JSON value in a response body
+
+    Handles plain JSON and the length-prefixed chunk stream used by
+    batchexecute-style responses, both optionally behind the XSSI prefix.
+    """
+    body = body.strip()
+    if body.startswith(XSSI_PREFIX):
+        body = body[len(XSSI_PREFIX):].lstrip()
+
+    decoder = json.JSONDecoder()
+    pos = 0
+    while pos < len(body):
+        # Skip whitespace and chunk length lines
+        while pos < len(body) and (body[pos].isspace() or body[pos].isdigit()):
+            pos += 1
+        if pos >= len(body):
+            break
+        try:
+            value, pos = decoder.raw_decode(body, pos)
+        except json.JSONDecodeError:
+            break
+        yield value
+
+
+def _expand(value):
+    """Yield value plus any JSON documents embedded in its strings (wrb.fr envelopes)"""
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            if node[:1] in '[{' and len(node) > 2:
+                try:
+                    stack.append(json.loads(node))
+                except ValueError:
+                    pass
+        elif isinstance(node, list):
+            yield node
+            stack.extend(reversed(node))  # Keep document order
+        elif isinstance(node, dict):
+            stack.extend(reversed(list(node.values())))
+
+
+def _clock(parts):
+    """[h, m] -> 'HH:MM'; either part may be missing or null"""
+    if not isinstance(parts, list) or not parts:
+        return None
+    hour = parts[0] or 0
+    minute = parts[1] if len(parts) > 1 and parts[1] else 0
+    if not isinstance(hour, int) or not isinstance(minute, int):
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+
+def _is_date(value):
+    return isinstance(value, list) and len(value) == 3 and all(isinstance(v, int) for v in value)
+
+
+def _flight_from_entry(entry, currency):
+    """Decode one [itinerary, [[_, price], token], ...] result entry, or return None"""
+    if not (isinstance(entry, list) and len(entry) >= 2 and isinstance(entry[0], list)):
+        return None
+    info = entry[0]
+    if len(info) < 10:
+        return None
+    airline_code, airline_names, legs = info[0], info[1], info[2]
+    departure_airport, departure_date, departure_time = info[3], info[4], info[5]
+    arrival_airport, arrival_date, arrival_time, duration = info[6], info[7], info[8], info[9]
+    if not (isinstance(airline_names, list) and isinstance(legs, list) and legs
+            and isinstance(departure_airport, str) and isinstance(arrival_airport, str)
+            and _is_date(departure_date) and _is_date(arrival_date)
+            and isinstance(duration, int)):
+        return None
+
+    try:
+        price = entry[1][0][1]
+    except (IndexError, TypeError):
+        price = None
+    if not isinstance(price, (int, float)):
+        price = None
+
+    names = [name for name in airline_names if isinstance(name, str)]
+    try:
+        day_offset = (date(*arrival_date) - date(*departure_date)).days
+    except ValueError:
+        day_offset = 0
+
+    return Flight(
+        price_cents=None if price is None else round(price * 100),
+        currency=currency if price is not None else None,
+        duration_minutes=duration,
+        stops=len(legs) - 1,
+        airline=", ".join(names) or (airline_code if isinstance(airline_code, str) else None),
+        departure_time=_clock(departure_time),
+        arrival_time=_clock(arrival_time),
+        arrival_day_offset=day_offset,
+        details=f"{departure_airport}-{arrival_airport}"
+    )
+
+
+def _flight_key(flight):
+    return (flight.airline, flight.departure_time, flight.arrival_time, flight.price_cents)
+
+
+def merge_flights(batches):
+    """Combine flights decoded from several responses, dropping repeats and renumbering"""
+    flights = []
+    seen = set()
+    for batch in batches:
+        for flight in batch:
+            key = _flight_key(flight)
+            if key in seen:
+                continue
+            seen.add(key)
+            flight.index = len(flights) + 1
+            flights.append(flight)
+    return flights
+
+
+def decode_flights(body, currency="USD"):
+    """Decode flights from a results response body or a results page's HTML
+
+    Walks every JSON structure in the payload and keeps the lists shaped
+    like flight result entries, so it tolerates the wrappers moving around.
+    Returns Flight records numbered in payload order.
+    """
+    if not body:
+        return []
+
+    documents = []
+    for data in _INIT_DATA.findall(body):
+        try:
+            documents.append(json.loads(data))
+        except ValueError:
+            continue
+    if not documents:
+        documents = list(_json_chunks(body))
+
+    return merge_flights(
+        filter(None, (_flight_from_entry(node, currency) for node in _expand(document)))
+        for document in documents
+    )
@@ -0,0 +1,203 @@
+import argparse
+import json
+from dataclasses import fields
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+from models import Flight
+
+
+def batched(iterable, size):
+    """Yield lists of up to size items"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# Stages: callables taking an iterable of flights and yielding flights
+
+def normalize(flights, currency="USD"):
+    """Coerce records to Flight, tidy text fields and fill in a default currency"""
+    for flight in flights:
+        flight = Flight.coerce(flight)
+        if flight.airline:
+            flight.airline = " ".join(flight.airline.split())
+        if flight.price_cents is not None and flight.currency is None:
+            flight.currency = currency
+        yield flight
+
+
+def dedupe(key=None):
+    """Stage dropping flights already seen in this stream (by airline, times and price by default)"""
+    key = key or (lambda flight: (flight.airline, flight.departure_time, flight.arrival_time, flight.price_cents))
+
+    def stage(flights):
+        seen = set()
+        for flight in flights:
+            identity = key(flight)
+            if identity in seen:
+                continue
+            seen.add(identity)
+            yield flight
+    return stage
+
+
+def enrich(flights):
+    """Stamp the extraction time and renumber flights after deduplication"""
+    for index, flight in enumerate(flights, start=1):
+        flight.index = index
+        if flight.extracted_at is None:
+            flight.extracted_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        yield flight
+
+
+# Sinks: write(batch) is called as batches arrive, close() once at the end
+
+class DatabaseSink:
+    """Stream flights into one FlightDatabase search, one transaction per batch
+
+    Listeners (e.g. price alerts) hear about the search once, on close, with
+    the cheapest flight of the whole stream rather than of each batch.
+    """
+
+    def __init__(self, db, origin, destination, departure_date=None, return_date=None):
+        self.db = db
+        self.search_id = db.start_search(origin, destination, departure_date, return_date)
+        self.cheapest = None
+
+    def write(self, flights):
+        if not self.db.add_flights(self.search_id, flights):
+            return
+        for flight in flights:
+            if flight.price_cents is not None and (
+                    self.cheapest is None or flight.price_cents < self.cheapest.price_cents):
+                self.cheapest = flight
+
+    def close(self):
+        self.db.finish_search(self.search_id, [self.cheapest] if self.cheapest else [])
+
+
+class JsonLinesSink:
+    """Append flights to a JSON Lines file, flushed after every batch"""
+
+    def __init__(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def write(self, flights):
+        self.file.writelines(json.dumps(flight.to_dict()) + "\n" for flight in flights)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetSink:
+    """Write flights to a Parquet file, one row group per batch"""
+
+    def __init__(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {int: pa.int64(), str: pa.string()}
+        self.columns = [field.name for field in fields(Flight)]
+        self.schema = pa.schema([(field.name, types[field.type]) for field in fields(Flight)])
+        self.table = pa.Table
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.writer = pq.ParquetWriter(str(path), self.schema)
+
+    def write(self, flights):
+        rows = [{name: getattr(flight, name) for name in self.columns} for flight in flights]
+        self.writer.write_table(self.table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class Pipeline:
+    """Run flights through stages and into sinks as they are produced
+
+    Nothing is collected up front: each batch is written to every sink as
+    soon as it fills, so memory stays bounded and results show up early.
+    """
+
+    def __init__(self, *stages, sinks=(), batch_size=50):
+        self.stages = stages
+        self.sinks = list(sinks)
+        self.batch_size = batch_size
+
+    def stream(self, flights):
+        """Apply the stages lazily"""
+        for stage in self.stages:
+            flights = stage(flights)
+        return flights
+
+    def run(self, flights):
+        """Drain flights through the pipeline into the sinks; returns the number written"""
+        written = 0
+        try:
+            for batch in batched(self.stream(flights), self.batch_size):
+                for sink in self.sinks:
+                    sink.write(batch)
+                written += len(batch)
+        finally:
+            for sink in self.sinks:
+                sink.close()
+        print(f"🚰 Streamed {written} flights to {len(self.sinks)} sinks")
+        return written
+
+
+def default_pipeline(db=None, origin=None, destination=None, departure_date=None, return_date=None,
+                     jsonl_path=None, parquet_path=None, batch_size=50):
+    """normalize → dedupe → enrich into whichever of the database/JSONL/Parquet sinks are given"""
+    sinks = []
+    if db is not None:
+        sinks.append(DatabaseSink(db, origin, destination, departure_date, return_date))
+    if jsonl_path:
+        sinks.append(JsonLinesSink(jsonl_path))
+    if parquet_path:
+        sinks.append(ParquetSink(parquet_path))
+    return Pipeline(normalize, dedupe(), enrich, sinks=sinks, batch_size=batch_size)
+
+
+if __name__ == "__main__":
+    from database import FlightDatabase
+    from replay import FIXTURE_DIR, iter_fixtures
+    from working_flight_scraper import WorkingFlightScraper
+
+    parser = argparse.ArgumentParser(description="Stream flights through the pipeline, live or from saved pages")
+    parser.add_argument("origin")
+    parser.add_argument("destination")
+    parser.add_argument("--live", metavar="DATE", help="Search this departure date now instead of replaying fixtures")
+    parser.add_argument("--return-date")
+    parser.add_argument("--headless", action="store_true", help="No browser window for --live")
+    parser.add_argument("--lean", action="store_true", help="Block images, fonts, media and trackers for --live")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="Directory of fixture JSON files")
+    parser.add_argument("--db", action="store_true", help="Save into the flight database")
+    parser.add_argument("--jsonl", help="Append flights to this JSON Lines file")
+    parser.add_argument("--parquet", help="Write flights to this Parquet file")
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    origin, destination = args.origin.upper(), args.destination.upper()
+    scraper = WorkingFlightScraper(headless=args.headless, lean=args.lean)
+    pipeline = default_pipeline(
+        db=FlightDatabase() if args.db else None,
+        origin=origin,
+        destination=destination,
+        departure_date=args.live,
+        return_date=args.return_date,
+        jsonl_path=args.jsonl,
+        parquet_path=args.parquet,
+        batch_size=args.batch_size
+    )
+    if args.live:
+        # Cards go to the sinks as they are parsed; the browser closes when the stream ends
+        pipeline.run(scraper.iter_search(origin, destination, args.live, args.return_date))
+    else:
+        pipeline.run(
+            flight
+            for fixture in iter_fixtures(args.fixtures)
+            for flight in scraper.iter_flight_details(fixture["html"], verbose=False)
+        )
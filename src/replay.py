@@ -0,0 +1,160 @@
+import html
+import json
+from datetime import datetime
+from pathlib import Path
+
+from models import Flight
+from results_log import iter_records, record_flights
+
+FIXTURE_DIR = 'data/fixtures'
+FIXTURE_VERSION = 1
+
+# Fields compared against golden outputs when scoring extraction accuracy
+GOLDEN_FIELDS = [
+    'price_cents', 'currency', 'departure_time', 'arrival_time',
+    'duration_minutes', 'stops', 'airline'
+]
+
+
+def save_fixture(path, page_html, url=None, metadata=None, expected=None):
+    """Write a fixture file: the page HTML plus its URL, metadata and golden flights"""
+    fixture = {
+        "version": FIXTURE_VERSION,
+        "url": url,
+        "captured_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "metadata": metadata or {},
+        "expected": [Flight.coerce(flight).to_dict() for flight in expected] if expected else None,
+        "html": page_html
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(fixture, f, ensure_ascii=False)
+    print(f"💾 Fixture saved to {path}")
+    return fixture
+
+
+def capture_fixture(driver, path, metadata=None, expected=None):
+    """Capture the current results page of a live driver as a fixture"""
+    return save_fixture(path, driver.page_source, url=driver.current_url,
+                        metadata=metadata, expected=expected)
+
+
+def load_fixture(path):
+    with open(path, encoding='utf-8') as f:
+        fixture = json.load(f)
+    if fixture.get("version") != FIXTURE_VERSION:
+        raise ValueError(f"Unsupported fixture version in {path}: {fixture.get('version')}")
+    fixture["path"] = str(path)
+    return fixture
+
+
+def iter_fixtures(directory=FIXTURE_DIR):
+    """Yield every fixture in a directory, sorted by file name"""
+    for path in sorted(Path(directory).glob('*.json')):
+        yield load_fixture(path)
+
+
+def render_cards(raw_texts):
+    """Render card texts as results-page markup shaped like Google Flights
+
+    Used to turn archived raw_text (e.g. from the results log) into
+    replayable pages when the original HTML was not kept.
+    """
+    cards = []
+    for text in raw_texts:
+        lines = []
+        for line in text.split('\n'):
+            escaped = html.escape(line)
+            if line.startswith('$'):
+                lines.append(f'<div class="FpEdX"><span aria-label="{html.escape(line[1:])} US dollars">{escaped}</span></div>')
+            elif ' hr' in line or ' min' in line:
+                lines.append(f'<div class="gvkrdb AdWm1c tPgKwe ogfYpf Ak5kof">{escaped}</div>')
+            else:
+                lines.append(f'<div>{escaped}</div>')
+        cards.append(f'<li class="pIav2d"><div class="yR1fYc">{"".join(lines)}</div></li>')
+    return f'<html><body><ul role="list">{"".join(cards)}</ul></body></html>'
+
+
+def fixture_from_results(results_path, fixture_path, metadata=None):
+    """Build a fixture from saved results, using their flights as golden output
+
+    Accepts a results log (the last search in it is used) or a legacy
+    flight_results.json written by older versions of save_results.
+    """
+    if '.jsonl' in Path(results_path).name:
+        record = None
+        for record in iter_records(results_path):
+            pass
+        if record is None:
+            raise ValueError(f"No results in {results_path}")
+        results = {"url": record["url"], "search_date": record["at"], "flights": record_flights(record)}
+    else:
+        with open(results_path, encoding='utf-8') as f:
+            results = json.load(f)
+        results["flights"] = [Flight.from_dict(flight) for flight in results["flights"]]
+    flights = [flight for flight in results["flights"] if flight.raw_text]
+    return save_fixture(
+        fixture_path,
+        render_cards(flight.raw_text for flight in flights),
+        url=results.get("url"),
+        metadata=dict(metadata or {}, source=str(results_path), search_date=results.get("search_date")),
+        expected=flights
+    )
+
+
+def score(flights, expected, fields=GOLDEN_FIELDS):
+    """Compare extracted flights to golden ones by position
+
+    Returns (matching field count, compared field count).
+    """
+    matched = compared = 0
+    for flight, golden in zip(flights, expected):
+        flight = Flight.coerce(flight).to_dict()
+        for field in fields:
+            if field in golden:
+                compared += 1
+                matched += flight.get(field) == golden[field]
+    # Missing flights count as misses for every golden field
+    for golden in expected[len(flights):]:
+        compared += sum(1 for field in fields if field in golden)
+    return matched, compared
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a replay fixture from saved results or a live page")
+    parser.add_argument("results", nargs="?",
+                        help="Results log (or legacy JSON) written by WorkingFlightScraper.save_results")
+    parser.add_argument("fixture", help="Fixture file to write")
+    parser.add_argument("--capture", nargs=3, metavar=("ORIGIN", "DESTINATION", "DATE"),
+                        help="Open this search in Chrome and save the real results page instead")
+    parser.add_argument("--return-date")
+    args = parser.parse_args()
+
+    if args.capture:
+        from selenium.webdriver.chrome.service import Service
+        from driver_pool import chrome_options, launch_driver
+        from search_url import build_search_url
+        from waits import ReadinessWaiter
+        from working_flight_scraper import RESULT_CARD_SELECTORS
+
+        origin, destination, departure_date = args.capture
+        driver = launch_driver(Service('./chromedriver.exe'), chrome_options())
+        try:
+            driver.get(build_search_url(origin, destination, departure_date, args.return_date))
+            waiter = ReadinessWaiter(driver, timeout=20)
+            waiter.results_loaded(RESULT_CARD_SELECTORS)
+            waiter.network_idle(timeout=5)
+            capture_fixture(driver, args.fixture, metadata={
+                "origin": origin, "destination": destination,
+                "departure_date": departure_date, "return_date": args.return_date
+            })
+        finally:
+            driver.quit()
+        print("✍️ Add hand-checked golden flights under \"expected\" before using it for accuracy")
+    elif args.results:
+        fixture_from_results(args.results, args.fixture)
+    else:
+        parser.error("give a results file or --capture ORIGIN DESTINATION DATE")
@@ -0,0 +1,205 @@
+import argparse
+import gzip
+import json
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+from models import Flight
+
+LOG_DIR = 'data/results'
+LOG_VERSION = 1
+
+# Rotated files carry a timestamp; the active file is just <name>.jsonl[.gz]
+ROTATED_NAME = re.compile(r'-\d{8}-\d{6}-\d{6}\.jsonl(\.gz)?$')
+
+# Flights are stored as positional rows in this order to keep lines short
+FLIGHT_COLUMNS = (
+    'price_cents', 'currency', 'duration_minutes', 'stops', 'airline',
+    'departure_time', 'arrival_time', 'arrival_day_offset', 'details', 'raw_text'
+)
+
+
+def _open(path, mode):
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def encode_search(origin, destination, flights, departure_date=None, return_date=None, url=None):
+    """One search as a compact log record, stamped in UTC like the database's search_date"""
+    if not origin or not destination:
+        raise ValueError("A logged search needs an origin and a destination")
+    return {
+        "v": LOG_VERSION,
+        "at": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        "o": origin,
+        "d": destination,
+        "dep": departure_date,
+        "ret": return_date,
+        "url": url,
+        "f": [
+            [getattr(flight, column) for column in FLIGHT_COLUMNS]
+            for flight in map(Flight.coerce, flights)
+        ]
+    }
+
+
+def record_flights(record):
+    """Flights of a log record, numbered in their logged order"""
+    return [
+        Flight(index=i + 1, extracted_at=record["at"], **dict(zip(FLIGHT_COLUMNS, row)))
+        for i, row in enumerate(record["f"])
+    ]
+
+
+def valid_record(record):
+    """Whether a record has what the database requires"""
+    return isinstance(record, dict) and bool(record.get("o")) and bool(record.get("d")) \
+        and isinstance(record.get("f"), list)
+
+
+def record_to_search(record):
+    """A log record as a FlightDatabase.save_searches entry"""
+    return {
+        "origin": record["o"],
+        "destination": record["d"],
+        "flights": record_flights(record),
+        "departure_date": record.get("dep"),
+        "return_date": record.get("ret"),
+        "search_date": record["at"]
+    }
+
+
+class ResultsLog:
+    """Append-only JSON Lines log of search results, one compact line per search
+
+    Lines go to <name>.jsonl (or .jsonl.gz) and are flushed as they are
+    written. Once the active file passes max_bytes it is renamed with a
+    timestamp and a new one is started, so finished files can be shipped
+    and imported while the worker keeps appending. Use one name per
+    process when several workers share a directory.
+    """
+
+    def __init__(self, directory=LOG_DIR, name='results', max_bytes=16 * 1024 * 1024, compress=False):
+        self.directory = Path(directory)
+        self.name = name
+        self.suffix = '.jsonl.gz' if compress else '.jsonl'
+        self.path = self.directory / f"{name}{self.suffix}"
+        self.max_bytes = max_bytes
+        self.file = None
+        self.lock = threading.Lock()
+
+    def append(self, origin, destination, flights, departure_date=None, return_date=None, url=None):
+        """Log one search and return its record"""
+        record = encode_search(origin, destination, flights, departure_date, return_date, url)
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n"
+        with self.lock:
+            if self.file is None:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self.file = _open(self.path, 'a')
+            self.file.write(line)
+            self.file.flush()
+            if self.path.stat().st_size >= self.max_bytes:
+                self._rotate()
+        return record
+
+    def _rotate(self):
+        self.file.close()
+        self.file = None
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        self.path.rename(self.directory / f"{self.name}-{stamp}{self.suffix}")
+
+    def rotate(self):
+        """Close the active file and start a new one, e.g. before shipping the directory"""
+        with self.lock:
+            if self.file is None:
+                if not self.path.exists():
+                    return
+                self.file = _open(self.path, 'a')
+            self._rotate()
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+
+def log_files(directory=LOG_DIR, include_active=False):
+    """Log files in a directory, rotated ones oldest first"""
+    return sorted(
+        path for path in Path(directory).glob('*.jsonl*')
+        if include_active or ROTATED_NAME.search(path.name)
+    )
+
+
+def iter_records(path):
+    """Yield the records of one log file, skipping a torn last line from an interrupted write"""
+    with _open(path, 'r') as f:
+        try:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"⚠️ Skipping unreadable line in {path}")
+        except EOFError:
+            # A gzip log that was not closed has no trailer; keep what was flushed
+            pass
+
+
+def _skip(path, record):
+    print(f"⚠️ Skipping invalid record in {path}: {json.dumps(record)[:120]}")
+    return False
+
+
+def import_logs(db, paths, batch_size=500, archive_dir=None):
+    """Load log files into the database with one save_searches transaction per batch
+
+    Returns the number of searches imported. With archive_dir, each file
+    is moved there once all of its records are saved, so re-running the
+    import does not load it twice.
+    """
+    imported = 0
+    for path in paths:
+        path = Path(path)
+        records = iter_records(path)
+        # One bad line must not roll back its whole batch; set it aside instead
+        records = (record for record in records if valid_record(record) or _skip(path, record))
+        while batch := [record_to_search(record) for record in islice(records, batch_size)]:
+            ids = db.save_searches(batch)
+            if len(ids) != len(batch):
+                raise RuntimeError(f"Import of {path} failed after {imported} searches")
+            imported += len(ids)
+        if archive_dir:
+            Path(archive_dir).mkdir(parents=True, exist_ok=True)
+            os.replace(path, Path(archive_dir) / path.name)
+        print(f"📥 Imported {path}")
+    print(f"✅ Imported {imported} searches")
+    return imported
+
+
+if __name__ == "__main__":
+    from database import FlightDatabase
+    from alerts import add_alert_arguments, attach_alerts
+
+    parser = argparse.ArgumentParser(description="Bulk import results logs into the flight database")
+    parser.add_argument("paths", nargs="*", help="Log files (default: rotated logs in --directory)")
+    parser.add_argument("--directory", default=LOG_DIR)
+    parser.add_argument("--include-active", action="store_true", help="Also import files still being written")
+    parser.add_argument("--batch-size", type=int, default=500, help="Searches per transaction")
+    parser.add_argument("--archive", help="Move imported files into this directory")
+    parser.add_argument("--db", default='data/flight_history.db')
+    add_alert_arguments(parser)
+    args = parser.parse_args()
+
+    paths = args.paths or log_files(args.directory, args.include_active)
+    if not paths:
+        print(f"⚠️ No logs to import in {args.directory}")
+    else:
+        db = FlightDatabase(args.db)
+        attach_alerts(db, args)
+        import_logs(db, paths, args.batch_size, args.archive)
@@ -0,0 +1,237 @@
+import argparse
+import heapq
+import itertools
+import json
+import queue
+import random
+import signal
+import threading
+import time
+from datetime import date
+
+from batch_runner import RateLimiter, SearchJob, SEARCH_HOST, search_job
+from driver_pool import DriverPool
+from database import FlightDatabase
+from selector_registry import default_registry
+from tracing import default_tracer
+from alerts import add_alert_arguments, attach_alerts
+
+WATCHLIST_PATH = 'data/watchlist.json'
+
+
+class TrackedRoute:
+    """One watched search and its scheduling state"""
+
+    def __init__(self, origin, destination, departure_date, return_date=None, every_minutes=360):
+        self.job = SearchJob(origin.upper(), destination.upper(), departure_date, return_date)
+        self.every = every_minutes * 60
+        self.prices = []  # Lowest price of each run, most recent last
+        self.runs = 0
+        self.failures = 0
+
+    def __repr__(self):
+        return f"{self.job.origin}→{self.job.destination} {self.job.departure_date}"
+
+    def days_to_departure(self, today=None):
+        return (date.fromisoformat(self.job.departure_date) - (today or date.today())).days
+
+    def price_moved(self, threshold):
+        """Whether the last run's lowest price moved by at least threshold (a fraction)"""
+        if len(self.prices) < 2 or not self.prices[-2]:
+            return False
+        return abs(self.prices[-1] - self.prices[-2]) / self.prices[-2] >= threshold
+
+
+def load_watchlist(path=WATCHLIST_PATH):
+    """Read routes from JSON: [{"origin", "destination", "departure_date", "return_date"?, "every_minutes"?}]"""
+    with open(path, encoding='utf-8') as f:
+        return [TrackedRoute(**entry) for entry in json.load(f)]
+
+
+class Scheduler:
+    """Long-running headless tracker that re-searches each watched route on its own cadence
+
+    Routes sit in a heap ordered by next run time. Due routes are handed to
+    a fixed set of worker threads through a bounded queue, so when workers
+    fall behind the scheduler waits instead of piling up work. A route is
+    out of the heap while it runs and rescheduled when it finishes, so the
+    same route never overlaps itself. Runs come more often close to
+    departure and after a big price move, with jitter to spread load.
+    """
+
+    def __init__(self, routes, workers=2, db=None, headless=True, lean=True, min_interval=2.0,
+                 jitter=0.15, move_threshold=0.1, min_every_minutes=15, queue_size=None):
+        self.workers = workers
+        self.db = db if db is not None else FlightDatabase()
+        self.lean = lean
+        self.pool = DriverPool(size=workers, headless=headless, lean=lean)
+        self.rate_limiter = RateLimiter(min_interval)
+        self.jitter = jitter
+        self.move_threshold = move_threshold
+        self.min_every = min_every_minutes * 60
+        self.queue = queue.Queue(maxsize=queue_size or workers)
+        self.stats = {"runs": 0, "failed": 0, "flights": 0}
+        self._heap = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads = []
+        now = time.monotonic()
+        for route in routes:
+            # Stagger the first runs instead of starting every route at once
+            self._push(route, now + random.uniform(0, self.jitter * route.every))
+
+    def _push(self, route, when):
+        with self._condition:
+            heapq.heappush(self._heap, (when, next(self._order), route))
+            self._condition.notify()
+
+    def interval(self, route):
+        """Seconds until the route's next run"""
+        seconds = route.every
+        days = route.days_to_departure()
+        if days <= 7:
+            seconds /= 4
+        elif days <= 30:
+            seconds /= 2
+        if route.price_moved(self.move_threshold):
+            seconds /= 2
+        seconds = max(seconds, self.min_every)
+        return seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _next_due(self):
+        """Block until a route is due (or stop is requested) and pop it"""
+        with self._condition:
+            while not self._stopping.is_set():
+                if self._heap:
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        return heapq.heappop(self._heap)[2]
+                    # Short waits so a stop request is noticed promptly
+                    self._condition.wait(min(delay, 1.0))
+                else:
+                    self._condition.wait(1.0)
+        return None
+
+    def _dispatch(self):
+        while not self._stopping.is_set():
+            route = self._next_due()
+            if route is None:
+                break
+            if route.days_to_departure() < 0:
+                print(f"🛬 {route} has departed, no longer tracking it")
+                continue
+            # Blocks while the workers are busy: backpressure instead of a backlog
+            while not self._stopping.is_set():
+                try:
+                    self.queue.put(route, timeout=1)
+                    break
+                except queue.Full:
+                    continue
+
+    def _work(self):
+        while not self._stopping.is_set():
+            try:
+                # Short waits so a stop request is noticed promptly
+                route = self.queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if self._stopping.is_set():
+                # Queued before the stop request; shutdown drops it instead of searching
+                break
+            self.rate_limiter.wait(SEARCH_HOST)
+            try:
+                result = search_job(route.job, self.pool, self.lean)
+            except Exception as e:
+                result = {"status": "error", "error": str(e)}
+            self._record(route, result)
+            if not self._stopping.is_set():
+                delay = self.interval(route)
+                self._push(route, time.monotonic() + delay)
+                print(f"🗓️ {route}: next run in {delay / 60:.0f} min")
+
+    def _count(self, name, value=1):
+        with self._condition:
+            self.stats[name] += value
+
+    def _record(self, route, result):
+        route.runs += 1
+        self._count("runs")
+        if result.get("status") != "success":
+            route.failures += 1
+            self._count("failed")
+            print(f"❌ {route}: {result.get('error')}")
+            return
+        flights = result["flights"]
+        self._count("flights", len(flights))
+        prices = [flight.price_cents for flight in flights if flight.price_cents is not None]
+        if prices:
+            route.prices = (route.prices + [min(prices)])[-10:]
+        self.db.save_search(route.job.origin, route.job.destination, flights,
+                            departure_date=route.job.departure_date, return_date=route.job.return_date)
+
+    def start(self):
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"⏰ Tracking {len(self._heap)} routes with {self.workers} workers")
+
+    def run(self):
+        """Schedule until stop() is called (e.g. from a signal handler)"""
+        self.start()
+        try:
+            self._dispatch()
+        finally:
+            self.shutdown()
+
+    def stop(self):
+        self._stopping.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    def shutdown(self):
+        """Let running searches finish, drop queued ones, then quit the browsers"""
+        self.stop()
+        for thread in self._threads:
+            thread.join()
+        skipped = 0
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+            skipped += 1
+        if skipped:
+            print(f"⏭️ Skipped {skipped} queued routes")
+        self.pool.close()
+        default_registry.save()
+        default_tracer.write_metrics()
+        print(f"👋 Scheduler stopped: {self.stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Track watched routes continuously")
+    parser.add_argument("--watchlist", default=WATCHLIST_PATH, help="JSON list of routes to track")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--min-interval", type=float, default=2.0, help="Seconds between searches")
+    parser.add_argument("--show-browser", action="store_true")
+    parser.add_argument("--full-pages", action="store_true", help="Load images and fonts too")
+    parser.add_argument("--trace", help="Export spans to this JSON Lines file")
+    add_alert_arguments(parser)
+    args = parser.parse_args()
+    default_tracer.trace_to(args.trace)
+
+    db = FlightDatabase()
+    attach_alerts(db, args)
+    scheduler = Scheduler(
+        load_watchlist(args.watchlist),
+        workers=args.workers,
+        db=db,
+        headless=not args.show_browser,
+        lean=not args.full_pages,
+        min_interval=args.min_interval
+    )
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: scheduler.stop())
+    scheduler.run()
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from atomic_file import atomic_write
+from models import Flight
+
+
+def cache_key(origin, destination, departure_date, return_date=None, cabin="economy", passengers=1):
+    """Normalized key identifying one search"""
+    return (
+        origin.strip().upper(),
+        destination.strip().upper(),
+        str(departure_date),
+        str(return_date) if return_date else None,
+        cabin,
+        int(passengers)
+    )
+
+
+def _serialize(result):
+    return dict(result, flights=[Flight.coerce(flight).to_dict() for flight in result.get("flights", [])])
+
+
+def _deserialize(result):
+    return dict(result, flights=[Flight.from_dict(flight) for flight in result.get("flights", [])])
+
+
+class FileCacheStore:
+    """Persist cached results as one JSON file per key so they survive restarts
+    and can be shared between worker processes"""
+
+    def __init__(self, directory='data/search_cache'):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key):
+        digest = hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def get(self, key):
+        """Return (stored_at, result) or None"""
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return entry["stored_at"], _deserialize(entry["result"])
+
+    def put(self, key, stored_at, result):
+        entry = {"key": key, "stored_at": stored_at, "result": _serialize(result)}
+        atomic_write(self._path(key), json.dumps(entry))
+
+    def delete(self, key):
+        self._path(key).unlink(missing_ok=True)
+
+    def prune(self, max_age):
+        """Delete entries (and leftover temp files) older than max_age seconds; returns how many"""
+        cutoff = time.time() - max_age
+        removed = 0
+        for path in self.directory.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+class SearchCache:
+    """TTL cache for search results with LRU eviction and hit/miss statistics
+
+    Recent results live in memory (at most max_entries); an optional store
+    such as FileCacheStore keeps them across runs and processes, and has its
+    expired entries pruned when the cache is created. Only results with
+    flights are cached, so a consent page or an extraction miss does not
+    hide the route for the whole TTL.
+    """
+
+    def __init__(self, ttl=3600, max_entries=512, store=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.store = store
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        if store is not None and hasattr(store, "prune"):
+            self.stats["expired"] += store.prune(ttl)
+
+    def get(self, key):
+        """Return a cached result for key, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is None and self.store is not None:
+            entry = self.store.get(key)
+            if entry is not None:
+                self._remember(key, entry)
+
+        if entry is None:
+            self._count("misses")
+            return None
+
+        stored_at, result = entry
+        if now - stored_at > self.ttl:
+            self.invalidate(key)
+            self._count("expired")
+            self._count("misses")
+            return None
+
+        self._count("hits")
+        return result
+
+    def put(self, key, result):
+        """Cache a successful search result; returns False for results without flights"""
+        if not result.get("flights"):
+            return False
+        entry = (time.time(), result)
+        self._remember(key, entry)
+        if self.store is not None:
+            self.store.put(key, *entry)
+        return True
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.store is not None:
+            self.store.delete(key)
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def hit_rate(self):
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def print_stats(self):
+        print(f"🗃️ Cache: {self.stats['hits']} hits, {self.stats['misses']} misses "
+              f"({self.hit_rate():.0%} hit rate), {self.stats['expired']} expired, "
+              f"{self.stats['evictions']} evicted")
@@ -0,0 +1,84 @@
+import base64
+from urllib.parse import urlencode
+
+SEARCH_URL = "https://www.google.com/travel/flights/search"
+
+# Enum values used by the Google Flights "tfs" search parameter
+TRIP_TYPES = {"round_trip": 1, "one_way": 2}
+CABINS = {"economy": 1, "premium_economy": 2, "business": 3, "first": 4}
+PASSENGER_TYPES = {"adult": 1, "child": 2, "infant_in_seat": 3, "infant_on_lap": 4}
+AIRPORT = 1
+
+
+def _varint(value):
+    """Encode an integer as a protobuf varint (negative values as 64-bit two's complement)"""
+    if value < 0:
+        value += 1 << 64
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _field_varint(number, value):
+    return _varint(number << 3) + _varint(value)
+
+
+def _field_bytes(number, payload):
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    return _varint((number << 3) | 2) + _varint(len(payload)) + payload
+
+
+def _airport(code):
+    return _field_varint(1, AIRPORT) + _field_bytes(2, code.upper())
+
+
+def _leg(origin, destination, date):
+    return (
+        _field_bytes(2, str(date))
+        + _field_bytes(13, _airport(origin))
+        + _field_bytes(14, _airport(destination))
+    )
+
+
+def encode_tfs(origin, destination, departure_date, return_date=None,
+               adults=1, children=0, cabin="economy"):
+    """Encode a search as the base64 protobuf used by the tfs= URL parameter"""
+    if cabin not in CABINS:
+        raise ValueError(f"Unknown cabin {cabin!r}, expected one of {sorted(CABINS)}")
+    if adults < 1:
+        raise ValueError("At least one adult passenger is required")
+
+    trip = "round_trip" if return_date else "one_way"
+    message = _field_varint(1, 28) + _field_varint(2, 2)
+    message += _field_bytes(3, _leg(origin, destination, departure_date))
+    if return_date:
+        message += _field_bytes(3, _leg(destination, origin, return_date))
+    for _ in range(adults):
+        message += _field_varint(8, PASSENGER_TYPES["adult"])
+    for _ in range(children):
+        message += _field_varint(8, PASSENGER_TYPES["child"])
+    message += _field_varint(9, CABINS[cabin])
+    message += _field_varint(14, 1)
+    message += _field_bytes(16, _field_varint(1, -1))  # no price limit
+    message += _field_varint(19, TRIP_TYPES[trip])
+
+    return base64.urlsafe_b64encode(message).decode('ascii').rstrip('=')
+
+
+def build_search_url(origin, destination, departure_date, return_date=None,
+                     adults=1, children=0, cabin="economy", language="en", currency="USD"):
+    """Build a results-page URL so a search is a single driver.get()
+
+    Dates are ISO strings (YYYY-MM-DD); leaving out return_date makes it
+    a one-way search.
+    """
+    tfs = encode_tfs(origin, destination, departure_date, return_date,
+                     adults=adults, children=children, cabin=cabin)
+    return f"{SEARCH_URL}?{urlencode({'tfs': tfs, 'hl': language, 'curr': currency})}"
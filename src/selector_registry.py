@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+from atomic_file import atomic_write
+from tracing import default_tracer
+
+STATS_PATH = 'data/selector_stats.json'
+
+
+class SelectorRegistry:
+    """Remember which selectors work and try the best ones first
+
+    For each group of interchangeable selectors (e.g. 'origin_input') it
+    keeps attempts, hits, a decaying success score and a decaying average
+    latency. A selector that starts failing loses score quickly and drops
+    below the alternatives, and the stats persist across runs in JSON.
+    """
+
+    def __init__(self, path=STATS_PATH, decay=0.7, default_score=0.5):
+        self.path = Path(path) if path else None
+        self.decay = decay
+        self.default_score = default_score
+        self.groups = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        if self.path and self.path.exists():
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    self.groups = json.load(f)
+            except json.JSONDecodeError:
+                print(f"⚠️ Ignoring unreadable selector stats in {self.path}")
+                self.groups = {}
+
+    def save(self):
+        """Write the stats atomically; safe to call from several threads or processes"""
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self.groups, indent=1, sort_keys=True)
+        atomic_write(self.path, data)
+
+    def _stats(self, group, selector):
+        return self.groups.setdefault(group, {}).setdefault(selector, {
+            "attempts": 0, "hits": 0, "score": self.default_score, "avg_ms": None
+        })
+
+    def ordered(self, group, selectors):
+        """Return selectors best-first; unseen ones keep their given order at the default score"""
+        with self._lock:
+            known = self.groups.get(group, {})
+
+            def rank(item):
+                position, selector = item
+                stats = known.get(selector)
+                if stats is None:
+                    return (-self.default_score, float('inf'), position)
+                avg_ms = stats["avg_ms"] if stats["avg_ms"] is not None else float('inf')
+                return (-stats["score"], avg_ms, position)
+
+            return [selector for _, selector in sorted(enumerate(selectors), key=rank)]
+
+    def record(self, group, selector, ok, seconds):
+        """Fold one attempt into the selector's stats"""
+        default_tracer.count("selector_attempts", group=group, outcome="hit" if ok else "miss")
+        with self._lock:
+            stats = self._stats(group, selector)
+            stats["attempts"] += 1
+            stats["hits"] += 1 if ok else 0
+            stats["score"] = self.decay * stats["score"] + (1 - self.decay) * (1.0 if ok else 0.0)
+            ms = seconds * 1000
+            if stats["avg_ms"] is None:
+                stats["avg_ms"] = ms
+            else:
+                stats["avg_ms"] = self.decay * stats["avg_ms"] + (1 - self.decay) * ms
+
+    def attempt(self, group, selectors, action):
+        """Call action(selector) best-first until one succeeds
+
+        A selector fails if action raises or returns a falsy value.
+        Returns (selector, result), or (None, None) if all fail.
+        """
+        for selector in self.ordered(group, selectors):
+            start = time.perf_counter()
+            try:
+                result = action(selector)
+            except Exception:
+                result = None
+            self.record(group, selector, bool(result), time.perf_counter() - start)
+            if result:
+                return selector, result
+        return None, None
+
+    def record_winner(self, group, ordered, winner, seconds=0.0):
+        """Record a batch evaluation: selectors tried before the winner missed"""
+        for selector in ordered:
+            if selector == winner:
+                self.record(group, selector, True, seconds)
+                return
+            self.record(group, selector, False, seconds)
+
+
+# Shared registry used by the scrapers unless they are given their own
+default_registry = SelectorRegistry()
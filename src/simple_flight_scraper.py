@@ -1,26 +1,96 @@
-from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-import time
 import json
+import argparse
+from waits import ReadinessWaiter
+from search_url import build_search_url
+from driver_pool import chrome_options, launch_driver
+from browser_profile import BLOCKED_URL_PATTERNS
+from models import Flight
+from parsing import parse_price
+
+# Walks the DOM inside the browser and returns every element whose rendered
+# text looks like a price, so the whole scan costs one WebDriver call.
+COLLECT_PRICES_JS = """
+const maxLength = arguments[0];
+const pattern = /\\$\\s?\\d/;
+const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+const seen = new Set();
+const prices = [];
+while (walker.nextNode()) {
+    const node = walker.currentNode;
+    if (!pattern.test(node.nodeValue)) continue;
+    // Report the element and each ancestor whose text is still price-sized
+    let elem = node.parentElement;
+    while (elem && !seen.has(elem)) {
+        seen.add(elem);
+        const text = (elem.innerText || '').trim();
+        if (!text || text.length >= maxLength) break;
+        prices.push(text);
+        elem = elem.parentElement;
+    }
+}
+return prices;
+"""
 
 class SimpleFlightScraper:
-    def __init__(self):
+    def __init__(self, headless=False, interactive=True, lean=False, debug=None):
+        """With interactive=False nothing waits for Enter before closing the browser
+        
+        lean=True blocks images, fonts, media and third-party hosts; screenshots
+        are then only saved with debug=True.
+        """
         self.service = Service('./chromedriver.exe')
-        self.options = webdriver.ChromeOptions()
-        self.options.add_argument('--disable-blink-features=AutomationControlled')
+        self.options = chrome_options(headless, lean)
+        self.blocked_urls = BLOCKED_URL_PATTERNS if lean else None
+        self.debug = debug if debug is not None else not lean
+        self.interactive = interactive
         self.driver = None
+        self.waiter = None
+    
+    def start_driver(self):
+        self.driver = launch_driver(self.service, self.options, self.blocked_urls)
+        self.waiter = ReadinessWaiter(self.driver)
+    
+    def close_driver(self):
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+    
+    def __enter__(self):
+        self.start_driver()
+        return self
     
-    def search_manual(self):
+    def __exit__(self, exc_type, exc, tb):
+        self.close_driver()
+    
+    def search(self, origin, destination, departure_date, return_date=None, use_js=True):
+        """Open the results for a search by deep link and collect prices, no manual steps"""
+        print(f"🔍 Opening results for {origin} → {destination} on {departure_date}...")
+        owns_driver = self.driver is None
+        if owns_driver:
+            self.start_driver()
+        try:
+            self.driver.get(build_search_url(origin, destination, departure_date, return_date))
+            self.waiter.page_loaded()
+            self.waiter.network_idle(timeout=5)
+            self.waiter.print_timings()
+            return self.collect_results(use_js)
+        finally:
+            if owns_driver:
+                self.close_driver()
+    
+    def search_manual(self, use_js=True):
         """Open Google Flights and let user search manually"""
         print("🔍 Opening Google Flights...")
         
-        self.driver = webdriver.Chrome(service=self.service, options=self.options)
-        self.driver.maximize_window()
+        owns_driver = self.driver is None
+        if owns_driver:
+            self.start_driver()
         
         # Go to Google Flights
         self.driver.get("https://www.google.com/travel/flights")
-        time.sleep(3)
+        self.waiter.page_loaded()
         
         print("\n" + "="*50)
         print("MANUAL SEARCH INSTRUCTIONS:")
@@ -35,11 +105,22 @@ class SimpleFlightScraper:
         print("="*50)
         print("\n⏰ You have 60 seconds to complete the search...\n")
         
-        # Wait 60 seconds for manual search
-        for i in range(60, 0, -10):
-            print(f"⏱️  {i} seconds remaining...")
-            time.sleep(10)
+        # Wait up to 60 seconds for manual search, continuing once results open
+        self.waiter.url_contains_any(["search", "booking"], step="manual_search", timeout=60)
+        self.waiter.network_idle(timeout=5)
+        self.waiter.print_timings()
         
+        try:
+            return self.collect_results(use_js)
+        finally:
+            if self.interactive:
+                print("\n🔄 Press Enter to close browser...")
+                input()
+            if owns_driver:
+                self.close_driver()
+    
+    def collect_results(self, use_js=True):
+        """Collect the prices shown on the current page"""
         print("\n📊 Attempting to extract results...")
         
         # Get current URL to see if we're on results
@@ -47,52 +128,90 @@ class SimpleFlightScraper:
         print(f"📍 Current URL: {current_url[:100]}...")
         
         # Take screenshot
-        self.driver.save_screenshot("manual_search_results.png")
-        print("📸 Screenshot saved as 'manual_search_results.png'")
+        if self.debug:
+            self.driver.save_screenshot("manual_search_results.png")
+            print("📸 Screenshot saved as 'manual_search_results.png'")
         
         # Try to find ANY price data
         results = []
         
         try:
-            # Look for anything with a dollar sign
-            all_elements = self.driver.find_elements(By.XPATH, "//*")
-            price_count = 0
+            if use_js:
+                price_texts = self.collect_prices_js()
+            else:
+                price_texts = self.collect_prices_dom()
             
-            for element in all_elements:
-                try:
-                    text = element.text
-                    if '$' in text and len(text) < 100:  # Likely a price
-                        price_count += 1
-                        if price_count <= 10:  # First 10 prices
-                            results.append({
-                                "element": price_count,
-                                "text": text.strip()
-                            })
-                            print(f"💰 Found price #{price_count}: {text.strip()}")
-                except:
-                    continue
+            price_count = len(price_texts)
+            for i, text in enumerate(price_texts[:10]):  # First 10 prices
+                price_cents, currency = parse_price(text)
+                results.append(Flight(
+                    index=i + 1,
+                    price_cents=price_cents,
+                    currency=currency,
+                    raw_text=text
+                ))
+                print(f"💰 Found price #{i + 1}: {text}")
             
             print(f"\n✅ Total price elements found: {price_count}")
             
         except Exception as e:
             print(f"❌ Error extracting data: {str(e)}")
         
-        print("\n🔄 Press Enter to close browser...")
-        input()
-        self.driver.quit()
-        
         return {
             "url": current_url,
             "prices_found": len(results),
-            "sample_prices": results[:5]
+            "sample_prices": [flight.to_dict() for flight in results[:5]],
+            "flights": results
         }
+    
+    def collect_prices_js(self, max_length=100):
+        """Collect price-like texts with a single in-browser DOM walk
+
+        Falls back to the element-by-element scan if the script fails.
+        """
+        try:
+            prices = self.driver.execute_script(COLLECT_PRICES_JS, max_length)
+            return [text.strip() for text in prices if '$' in text]
+        except Exception as e:
+            print(f"⚠️ In-browser price scan failed, falling back to DOM scan: {str(e)}")
+            return self.collect_prices_dom(max_length)
+    
+    def collect_prices_dom(self, max_length=100):
+        """Collect price-like texts by reading every element over WebDriver"""
+        prices = []
+        
+        # Look for anything with a dollar sign
+        all_elements = self.driver.find_elements(By.XPATH, "//*")
+        for element in all_elements:
+            try:
+                text = element.text
+                if '$' in text and len(text) < max_length:  # Likely a price
+                    prices.append(text.strip())
+            except:
+                continue
+        
+        return prices
 
 # Run the manual scraper
 if __name__ == "__main__":
-    scraper = SimpleFlightScraper()
-    result = scraper.search_manual()
+    parser = argparse.ArgumentParser(description="Collect prices from Google Flights")
+    parser.add_argument("origin", nargs="?", default="JFK")
+    parser.add_argument("destination", nargs="?", default="LAX")
+    parser.add_argument("--date", help="Departure date (YYYY-MM-DD); searches automatically instead of by hand")
+    parser.add_argument("--headless", action="store_true", help="No browser window and no prompts (needs --date)")
+    parser.add_argument("--lean", action="store_true", help="Block images, fonts, media and trackers; no screenshots")
+    args = parser.parse_args()
+    if args.headless and not args.date:
+        parser.error("--headless needs --date")
+    
+    if args.date:
+        with SimpleFlightScraper(headless=args.headless, interactive=False, lean=args.lean) as scraper:
+            result = scraper.search(args.origin, args.destination, args.date)
+    else:
+        scraper = SimpleFlightScraper(lean=args.lean)
+        result = scraper.search_manual()
     
     print("\n" + "="*50)
     print("SUMMARY:")
     print("="*50)
-    print(json.dumps(result, indent=2))
\ No newline at end of file
+    print(json.dumps(result, indent=2, default=Flight.to_dict))
\ No newline at end of file
@@ -0,0 +1,193 @@
+import atexit
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from atomic_file import atomic_write
+
+METRIC_PREFIX = "flight_scraper"
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Tracer:
+    """Record timed spans for each scraper stage and export them
+
+    Spans nest per thread and carry free-form attributes (selector used,
+    card counts, ...). Per-span totals and named counters are kept in memory
+    and written as a Prometheus text file by write_metrics(). Exporting the
+    spans themselves is opt-in: with a path (see trace_to) finished spans are
+    buffered and appended to a JSON Lines file in chunks, which is rotated to
+    <path>.1 once it passes max_bytes.
+    """
+
+    def __init__(self, path=None, metrics_path='data/metrics.prom', buffer_size=100,
+                 max_bytes=16 * 1024 * 1024):
+        self.path = Path(path) if path else None
+        self.metrics_path = Path(metrics_path) if metrics_path else None
+        self.buffer_size = buffer_size
+        self.max_bytes = max_bytes
+        self.totals = {}
+        self.counters = {}
+        self._buffer = []
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+
+    def trace_to(self, path):
+        """Start exporting finished spans to a JSON Lines file (None stops it)"""
+        self.flush()
+        self.path = Path(path) if path else None
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Time a with-block as a span; yields the span's attribute dict for annotations"""
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        span_id = f"{os.getpid():x}-{next(self._ids):x}"
+        record = {
+            "name": name,
+            "span_id": span_id,
+            "parent_id": parent["span_id"] if parent else None,
+            "trace_id": parent["trace_id"] if parent else span_id,
+            "start": datetime.now().isoformat(timespec='milliseconds'),
+            "attributes": attributes
+        }
+        stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record["attributes"]
+            record["ok"] = True
+        except BaseException as e:
+            record["ok"] = False
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["seconds"] = round(time.perf_counter() - start, 6)
+            stack.pop()
+            self._finish(record)
+
+    def annotate(self, **attributes):
+        """Add attributes to the innermost open span of this thread"""
+        stack = self._stack()
+        if stack:
+            stack[-1]["attributes"].update(attributes)
+
+    def traced(self, name=None):
+        """Decorator running the function inside a span"""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name, value=1, **labels):
+        """Increment a named counter, e.g. count('selector_attempts', group='price', outcome='hit')"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def _finish(self, record):
+        with self._lock:
+            totals = self.totals.setdefault(record["name"], {"calls": 0, "errors": 0, "seconds": 0.0, "last": 0.0})
+            totals["calls"] += 1
+            totals["errors"] += 0 if record["ok"] else 1
+            totals["seconds"] += record["seconds"]
+            totals["last"] = record["seconds"]
+            if self.path:
+                self._buffer.append(json.dumps(record, default=str) + "\n")
+                full = len(self._buffer) >= self.buffer_size
+            else:
+                full = False
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Append buffered spans to the trace file, outside the lock the spans take"""
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        if not lines or not self.path:
+            return
+        with self._file_lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write("".join(lines))
+            if self.path.stat().st_size >= self.max_bytes:
+                self.path.replace(self.path.with_name(self.path.name + '.1'))
+
+    def metrics_text(self):
+        """Span totals and counters in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            totals = dict(self.totals)
+            counters = dict(self.counters)
+
+        for metric, kind, help_text, field in (
+            ("span_calls_total", "counter", "Finished spans", "calls"),
+            ("span_errors_total", "counter", "Spans that raised", "errors"),
+            ("span_seconds_total", "counter", "Total time spent in spans", "seconds"),
+            ("span_last_seconds", "gauge", "Duration of the most recent span", "last")
+        ):
+            lines.append(f"# HELP {METRIC_PREFIX}_{metric} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{metric} {kind}")
+            for name, values in sorted(totals.items()):
+                lines.append(f'{METRIC_PREFIX}_{metric}{{span="{_label(name)}"}} {values[field]}')
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name}_total counter")
+            for (counter, labels), value in sorted(counters.items()):
+                if counter == name:
+                    label_text = ",".join(f'{key}="{_label(value_)}"' for key, value_ in labels)
+                    lines.append(f"{METRIC_PREFIX}_{name}_total{{{label_text}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_metrics(self, path=None):
+        """Write metrics_text() atomically, for a node exporter textfile collector or similar
+
+        Also flushes buffered spans. Safe to call from several threads or processes.
+        """
+        self.flush()
+        path = Path(path) if path else self.metrics_path
+        if not path:
+            return
+        atomic_write(path, self.metrics_text())
+
+    def print_summary(self):
+        print("⏱️ Span totals:")
+        for name, values in sorted(self.totals.items(), key=lambda item: -item[1]["seconds"]):
+            print(f"   {name}: {values['calls']} calls, {values['seconds']:.2f}s total, {values['errors']} errors")
+
+
+# Tracer used by the scrapers and database
+default_tracer = Tracer()
+atexit.register(default_tracer.flush)
+
+
+def span(name, **attributes):
+    return default_tracer.span(name, **attributes)
+
+
+def annotate(**attributes):
+    default_tracer.annotate(**attributes)
+
+
+def traced(name=None):
+    return default_tracer.traced(name)
@@ -0,0 +1,116 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+import time
+from tracing import span
+from browser_profile import RESOURCE_BUFFER_JS
+
+# Counts finished resource loads so we can tell when the network goes quiet.
+# Raising the buffer here too covers drivers not started by launch_driver.
+RESOURCE_COUNT_JS = RESOURCE_BUFFER_JS + " return performance.getEntriesByType('resource').length"
+
+
+class ReadinessWaiter:
+    """Wait for concrete page readiness signals instead of fixed sleeps
+
+    Every wait is recorded in ``timings`` with how long it actually took,
+    so slow steps show up without guessing.
+    """
+
+    def __init__(self, driver, timeout=20, poll_frequency=0.25):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.timings = []
+
+    def _wait(self, step, condition, timeout=None):
+        """Run a WebDriverWait, record its duration and return the result (None on timeout)"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        with span(f"wait.{step}", timeout=timeout) as attributes:
+            try:
+                result = WebDriverWait(self.driver, timeout, poll_frequency=self.poll_frequency).until(condition)
+                ok = True
+            except TimeoutException:
+                result = None
+                ok = False
+            attributes["ready"] = ok
+        elapsed = time.perf_counter() - start
+        self.timings.append({"step": step, "seconds": round(elapsed, 3), "ok": ok})
+        if not ok:
+            print(f"⏱️ {step}: gave up after {elapsed:.1f}s")
+        return result
+
+    def page_loaded(self, step="navigation", timeout=None):
+        """Wait until the document has finished loading"""
+        return self._wait(
+            step,
+            lambda driver: driver.execute_script("return document.readyState") == "complete",
+            timeout
+        )
+
+    def url_changes(self, old_url, step="url_change", timeout=None):
+        """Wait until the browser navigates away from old_url"""
+        return self._wait(step, EC.url_changes(old_url), timeout)
+
+    def url_contains_any(self, fragments, step="url_match", timeout=None):
+        """Wait until the current URL contains one of the fragments"""
+        return self._wait(step, EC.any_of(*[EC.url_contains(f) for f in fragments]), timeout)
+
+    def any_present(self, selectors, step="element", timeout=None, by=By.CSS_SELECTOR):
+        """Wait until any of the selectors matches an element and return it"""
+        return self._wait(
+            step,
+            EC.any_of(*[EC.presence_of_element_located((by, s)) for s in selectors]),
+            timeout
+        )
+
+    def clickable(self, selector, step="clickable", timeout=None, by=By.XPATH):
+        """Wait until an element is visible and enabled and return it"""
+        return self._wait(step, EC.element_to_be_clickable((by, selector)), timeout)
+
+    def gone(self, selector, step="dismissed", timeout=None, by=By.CSS_SELECTOR):
+        """Wait until no visible element matches the selector"""
+        return self._wait(step, EC.invisibility_of_element_located((by, selector)), timeout)
+
+    def results_loaded(self, selectors, min_count=1, step="results", timeout=None):
+        """Wait until a result list selector matches at least min_count elements"""
+        def populated(driver):
+            for selector in selectors:
+                elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                if len(elements) >= min_count:
+                    return elements
+            return False
+
+        return self._wait(step, populated, timeout)
+
+    def network_idle(self, idle_time=0.5, step="network_idle", timeout=None):
+        """Wait until no new resources have loaded for idle_time seconds"""
+        state = {"count": -1, "since": time.perf_counter()}
+
+        def idle(driver):
+            count = driver.execute_script(RESOURCE_COUNT_JS)
+            now = time.perf_counter()
+            if count != state["count"]:
+                state["count"] = count
+                state["since"] = now
+                return False
+            return now - state["since"] >= idle_time
+
+        return self._wait(step, idle, timeout)
+
+    def payload_decoded(self, capture, step="results_payload", timeout=None):
+        """Wait until a NetworkCapture has decoded flights and return them"""
+        return self._wait(step, lambda driver: capture.collect() or False, timeout)
+
+    def total_seconds(self):
+        return round(sum(t["seconds"] for t in self.timings), 3)
+
+    def print_timings(self):
+        """Print how long each wait step took"""
+        print("⏱️ Step timings:")
+        for timing in self.timings:
+            status = "✅" if timing["ok"] else "⚠️"
+            print(f"   {status} {timing['step']}: {timing['seconds']:.2f}s")
+        print(f"   Total waiting: {self.total_seconds():.2f}s")
@@ -1,24 +1,98 @@
-from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import time
 import json
-from datetime import datetime
+import argparse
+from html_extractor import PageSnapshot, SelectorSet
+from waits import ReadinessWaiter
+from models import Flight
+from selector_registry import default_registry
+from parsing import CardParser, CarrierMatcher, default_parser, parse_price
+from network_capture import NetworkCapture, enable_performance_log
+from payload_decoder import decode_flights
+from tracing import traced, annotate, default_tracer
+from search_url import build_search_url
+from driver_pool import chrome_options, launch_driver, driver_broken
+from browser_profile import BLOCKED_URL_PATTERNS
+from results_log import ResultsLog
+
+# Card-specific selectors; only these signal that results have rendered
+RESULT_CARD_SELECTORS = [
+    "li[class*='pIav2d']",  # Common flight list item
+    "div[jscontroller*='xKXaIb']",  # Flight controller
+    "div[class*='yR1fYc']"  # Flight card
+]
+
+# Possible flight card containers, compiled once and matched in a single pass;
+# the generic fallbacks also match before any result has rendered
+CARD_SELECTORS = SelectorSet(RESULT_CARD_SELECTORS + [
+    "ul[role='list'] > li",  # List items
+    "div[data-ved]"  # Elements with tracking
+])
+
+PRICE_TEXT_SELECTOR = "*:contains('$')"
+
+def looks_like_flight_cards(elements):
+    """Check if the first few elements look like flight cards"""
+    for elem in elements[:3]:
+        text = elem.text
+        if '$' in text and ('AM' in text or 'PM' in text or 'hr' in text):
+            return True
+    return False
 
 class WorkingFlightScraper:
-    def __init__(self):
+    def __init__(self, pool=None, carriers=None, selectors=None, capture=False, headless=False, results_log=None,
+                 lean=False, debug=None):
+        self.pool = pool
+        # Append-only log that save_results writes to
+        self.results_log = results_log if results_log is not None else ResultsLog()
+        self.selectors = selectors if selectors is not None else default_registry
+        # Card text parser; pass carriers to override the default airline table
+        self.parser = CardParser(CarrierMatcher(carriers)) if carriers else default_parser
         self.service = Service('./chromedriver.exe')
-        self.options = webdriver.ChromeOptions()
-        self.options.add_argument('--disable-blink-features=AutomationControlled')
+        # Same browser profile as GoogleFlightsScraper; lean skips heavy content
+        self.options = chrome_options(headless, lean)
+        self.blocked_urls = BLOCKED_URL_PATTERNS if lean else None
+        # Screenshots only when debugging (by default, unless lean)
+        self.debug = debug if debug is not None else not lean
+        # Decode flights from the results data responses before parsing cards
+        self.capture = capture
+        if capture:
+            enable_performance_log(self.options)
         self.driver = None
-        self.wait = None
+        self.network = None
+        self.waiter = None
     
+    @traced("start_driver")
     def start_driver(self):
-        self.driver = webdriver.Chrome(service=self.service, options=self.options)
-        self.wait = WebDriverWait(self.driver, 10)
-        self.driver.maximize_window()
+        if self.pool:
+            self.driver = self.pool.acquire()
+        else:
+            self.driver = launch_driver(self.service, self.options, self.blocked_urls)
+        self.waiter = ReadinessWaiter(self.driver, timeout=10)
+        if self.capture:
+            self.network = NetworkCapture(self.driver)
+            self.network.clear()
+    
+    def __enter__(self):
+        self.start_driver()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        # A driver that failed mid-search is not handed back to the pool
+        self.close_driver(broken=exc_type is not None)
+    
+    def close_driver(self, broken=False):
+        """Quit the driver, or hand it back to the pool"""
+        if self.driver:
+            if self.pool:
+                self.pool.release(self.driver, broken=broken)
+            else:
+                self.driver.quit()
+            self.driver = None
+        self.results_log.close()
+        if not self.pool:
+            # Pooled runs save once at the end instead (BatchRunner, Scheduler)
+            self.selectors.save()
+            default_tracer.write_metrics()
     
     def search_with_assistance(self, origin, destination):
         """Semi-automated search with manual date selection"""
@@ -28,7 +102,7 @@ class WorkingFlightScraper:
         
         # Start at Google Flights
         self.driver.get("https://www.google.com/travel/flights")
-        time.sleep(3)
+        self.waiter.page_loaded()
         
         print("\n" + "="*50)
         print("PLEASE COMPLETE THE SEARCH:")
@@ -40,51 +114,116 @@ class WorkingFlightScraper:
         print("="*50)
         print("\n⏰ You have 45 seconds...\n")
         
-        # Wait for manual input
-        time.sleep(45)
+        # Wait for manual input, continuing as soon as results open
+        self.waiter.url_contains_any(["search", "booking"], step="manual_search", timeout=45)
         
         # Check if we're on results page
         current_url = self.driver.current_url
         if "search" in current_url or "booking" in current_url:
             print("✅ On results page!")
-            return self.extract_flight_details()
+            return self.results_flights()
         else:
             print("❌ Not on results page")
             return None
     
-    def extract_flight_details(self):
-        """Extract detailed flight information"""
+    def search(self, origin, destination, departure_date, return_date=None):
+        """Fully automated search: open the results page by deep link, no manual steps
+        
+        Uses the open driver if there is one (see the context manager),
+        otherwise starts one and releases it afterwards.
+        """
+        print(f"🔍 Starting search: {origin} → {destination} on {departure_date}")
+        owns_driver = self.driver is None
+        if owns_driver:
+            self.start_driver()
+        broken = False
+        try:
+            self.driver.get(build_search_url(origin, destination, departure_date, return_date))
+            self.waiter.page_loaded()
+            return self.results_flights()
+        except Exception as e:
+            print(f"❌ Error during search: {str(e)}")
+            broken = driver_broken(e)
+            return []
+        finally:
+            if owns_driver:
+                self.close_driver(broken=broken)
+    
+    def iter_search(self, origin, destination, departure_date, return_date=None):
+        """Like search, but yield flights as their cards are parsed, for streaming consumers
+        
+        A driver started here is released once the generator is exhausted or closed.
+        """
+        print(f"🔍 Starting search: {origin} → {destination} on {departure_date}")
+        owns_driver = self.driver is None
+        if owns_driver:
+            self.start_driver()
+        broken = False
+        try:
+            self.driver.get(build_search_url(origin, destination, departure_date, return_date))
+            self.waiter.page_loaded()
+            flights = None
+            if self.network:
+                flights = self.network.collect() or decode_flights(self.driver.page_source)
+            if flights:
+                print(f"📡 Decoded {len(flights)} flights from the results data")
+                yield from flights
+            else:
+                yield from self.iter_flight_details(verbose=False)
+        except Exception as e:
+            print(f"❌ Error during search: {str(e)}")
+            broken = driver_broken(e)
+        finally:
+            if owns_driver:
+                self.close_driver(broken=broken)
+    
+    def results_flights(self):
+        """Flights on the current results page, from the captured data if available"""
+        if self.network:
+            flights = self.network.collect() or decode_flights(self.driver.page_source)
+            if flights:
+                print(f"📡 Decoded {len(flights)} flights from the results data")
+                return flights
+        return self.extract_flight_details()
+    
+    @traced("extract_flight_details")
+    def extract_flight_details(self, html=None):
+        """Extract detailed flight information
+
+        The page source is fetched once and every card is parsed offline.
+        Pass ``html`` to re-parse a saved results page without a browser.
+        """
+        flights = list(self.iter_flight_details(html))
+        print(f"✅ Extracted {len(flights)} flights")
+        annotate(flights=len(flights))
+        return flights
+    
+    def iter_flight_details(self, html=None, verbose=True):
+        """Yield flights one by one as their cards are parsed, for streaming consumers"""
         print("\n📊 Extracting flight details...")
         
-        flights = []
+        found = 0
         
         try:
-            # Wait for page to stabilize
-            time.sleep(3)
+            if html is None:
+                # Wait for result cards to render and the page to settle
+                self.waiter.results_loaded(
+                    self.selectors.ordered("detail_cards", RESULT_CARD_SELECTORS), timeout=5
+                )
+                self.waiter.network_idle(timeout=3)
+                self.waiter.print_timings()
+                snapshot = PageSnapshot.from_driver(self.driver)
+            else:
+                snapshot = PageSnapshot(html)
             
             # Method 1: Look for flight cards/containers
-            # Try multiple possible selectors
-            selectors = [
-                "li[class*='pIav2d']",  # Common flight list item
-                "div[jscontroller*='xKXaIb']",  # Flight controller
-                "div[class*='yR1fYc']",  # Flight card
-                "ul[role='list'] > li",  # List items
-                "div[data-ved]"  # Elements with tracking
-            ]
-            
-            flight_elements = []
-            for selector in selectors:
-                elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    # Check if these look like flight cards
-                    for elem in elements[:3]:  # Check first 3
-                        text = elem.text
-                        if '$' in text and ('AM' in text or 'PM' in text or 'hr' in text):
-                            flight_elements = elements
-                            print(f"✅ Found flight elements with selector: {selector}")
-                            break
-                if flight_elements:
-                    break
+            # Try the historically best card selector first
+            ordered = self.selectors.ordered("detail_cards", [s.source for s in CARD_SELECTORS])
+            selector, flight_elements = snapshot.first_match(SelectorSet(ordered), accept=looks_like_flight_cards)
+            self.selectors.record_winner("detail_cards", ordered, selector)
+            annotate(selector=selector, cards=len(flight_elements))
+            if flight_elements:
+                print(f"✅ Found flight elements with selector: {selector}")
             
             # Extract data from flight elements
             for i, element in enumerate(flight_elements[:10]):  # First 10 flights
@@ -92,134 +231,126 @@ class WorkingFlightScraper:
                     text = element.text
                     if '$' in text and len(text) > 20:  # Likely a flight
                         
-                        # Create flight object
-                        flight = {
-                            "index": i + 1,
-                            "raw_text": text,
-                            "price": self.extract_price(text),
-                            "times": self.extract_times(text),
-                            "duration": self.extract_duration(text),
-                            "airline": self.extract_airline(text),
-                            "stops": self.extract_stops(text)
-                        }
-                        
-                        flights.append(flight)
+                        # Parse every field in one pass and create flight object
+                        card = self.parser.parse(text)
+                        flight = Flight.from_card(card, raw_text=text, index=i + 1)
                         
                         # Print summary
-                        print(f"\n✈️ Flight #{i+1}:")
-                        print(f"   Price: {flight['price']}")
-                        print(f"   Times: {flight['times']}")
-                        print(f"   Duration: {flight['duration']}")
-                        print(f"   Airline: {flight['airline']}")
-                        print(f"   Stops: {flight['stops']}")
+                        if verbose:
+                            print(f"\n✈️ Flight #{i+1}:")
+                            print(f"   Price: {card.price_text or 'N/A'}")
+                            print(f"   Times: {card.times or 'N/A'}")
+                            print(f"   Duration: {self.format_duration(card.duration_minutes)}")
+                            print(f"   Airline: {card.airline or 'N/A'}")
+                            print(f"   Stops: {self.format_stops(card.stops, text)}")
+                        
+                        found += 1
+                        yield flight
                         
                 except Exception as e:
                     continue
             
             # If no structured data found, fall back to price extraction
-            if not flights:
+            if not found:
                 print("⚠️ No flight cards found, extracting prices only...")
-                price_elements = self.driver.find_elements(By.XPATH, "//*[contains(text(), '$')]")
+                price_elements = snapshot.select(PRICE_TEXT_SELECTOR)
                 
                 for i, elem in enumerate(price_elements[:20]):
                     text = elem.text
                     if '$' in text and len(text) < 200:
-                        flights.append({
-                            "index": i + 1,
-                            "price_text": text.strip()
-                        })
+                        price_cents, currency = parse_price(text)
+                        yield Flight(
+                            index=i + 1,
+                            price_cents=price_cents,
+                            currency=currency,
+                            raw_text=text.strip()
+                        )
             
             # Take screenshot
-            self.driver.save_screenshot("flight_results_detailed.png")
-            print(f"\n📸 Screenshot saved")
-            print(f"✅ Extracted {len(flights)} flights")
+            if html is None and self.debug:
+                self.driver.save_screenshot("flight_results_detailed.png")
+                print(f"\n📸 Screenshot saved")
             
         except Exception as e:
             print(f"❌ Error during extraction: {str(e)}")
-        
-        return flights
     
     def extract_price(self, text):
         """Extract price from text"""
-        if '$' in text:
-            # Find the dollar sign
-            start = text.find('$')
-            # Extract until space or newline
-            end = start + 1
-            while end < len(text) and text[end].isdigit():
-                end += 1
-            return text[start:end]
-        return "N/A"
+        return self.parser.parse(text).price_text or "N/A"
     
     def extract_times(self, text):
         """Extract departure and arrival times"""
-        import re
-        # Look for time patterns like 6:00 AM
-        times = re.findall(r'\d{1,2}:\d{2}\s*(?:AM|PM|am|pm)', text)
-        if len(times) >= 2:
-            return f"{times[0]} - {times[1]}"
-        return "N/A"
+        return self.parser.parse(text).times or "N/A"
     
     def extract_duration(self, text):
         """Extract flight duration"""
-        import re
-        # Look for patterns like "5 hr 30 min" or "5h 30m"
-        duration = re.search(r'(\d+)\s*(?:hr|h)\s*(\d+)?\s*(?:min|m)?', text)
-        if duration:
-            hours = duration.group(1)
-            mins = duration.group(2) if duration.group(2) else "0"
-            return f"{hours}h {mins}m"
-        return "N/A"
+        return self.format_duration(self.parser.parse(text).duration_minutes)
     
     def extract_airline(self, text):
         """Extract airline name"""
-        # Common airlines
-        airlines = ['United', 'American', 'Delta', 'Southwest', 'JetBlue', 
-                   'Alaska', 'Spirit', 'Frontier', 'Hawaiian']
-        
-        for airline in airlines:
-            if airline in text:
-                return airline
-        
-        return "N/A"
+        return self.parser.carriers.find(text) or "N/A"
     
     def extract_stops(self, text):
         """Extract number of stops"""
-        if 'Nonstop' in text or 'nonstop' in text:
+        return self.format_stops(self.parser.parse(text).stops, text)
+    
+    @staticmethod
+    def format_duration(minutes):
+        if minutes is None:
+            return "N/A"
+        return f"{minutes // 60}h {minutes % 60}m"
+    
+    @staticmethod
+    def format_stops(stops, text=""):
+        if stops == 0:
             return "Nonstop"
-        elif '1 stop' in text:
+        elif stops == 1:
             return "1 stop"
-        elif '2 stop' in text:
-            return "2 stops"
+        elif stops is not None:
+            return f"{stops} stops"
         elif 'stop' in text:
             return "Multiple stops"
         return "N/A"
     
-    def save_results(self, flights, filename="flight_results.json"):
-        """Save results to JSON file"""
-        results = {
-            "search_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "url": self.driver.current_url,
-            "total_flights": len(flights),
-            "flights": flights
-        }
-        
-        with open(f"data/{filename}", 'w') as f:
-            json.dump(results, f, indent=2)
+    def save_results(self, flights, origin, destination, departure_date=None, return_date=None):
+        """Append results to the results log; earlier runs are kept"""
+        record = self.results_log.append(
+            origin, destination, flights, departure_date, return_date,
+            url=self.driver.current_url if self.driver else None
+        )
         
-        print(f"\n💾 Results saved to data/{filename}")
-        return results
+        print(f"\n💾 Results appended to {self.results_log.path}")
+        return record
 
 # Main execution
 if __name__ == "__main__":
-    scraper = WorkingFlightScraper()
+    parser = argparse.ArgumentParser(description="Extract detailed flight results")
+    parser.add_argument("origin", nargs="?", default="JFK")
+    parser.add_argument("destination", nargs="?", default="LAX")
+    parser.add_argument("--date", help="Departure date (YYYY-MM-DD); searches automatically instead of asking")
+    parser.add_argument("--return-date")
+    parser.add_argument("--headless", action="store_true", help="No browser window and no prompts (needs --date)")
+    parser.add_argument("--lean", action="store_true", help="Block images, fonts, media and trackers; no screenshots")
+    args = parser.parse_args()
+    if args.headless and not args.date:
+        parser.error("--headless needs --date")
+    
+    scraper = WorkingFlightScraper(headless=args.headless, lean=args.lean)
+    
+    if args.date:
+        with scraper:
+            flights = scraper.search(args.origin, args.destination, args.date, args.return_date)
+            if flights:
+                scraper.save_results(flights, args.origin, args.destination, args.date, args.return_date)
+        print(json.dumps([flight.to_dict() for flight in flights]))
+        raise SystemExit(0 if flights else 1)
     
     # Search with manual assistance
-    flights = scraper.search_with_assistance("JFK", "LAX")
+    flights = scraper.search_with_assistance(args.origin, args.destination)
     
     if flights:
         # Save results
-        results = scraper.save_results(flights)
+        scraper.save_results(flights, args.origin, args.destination)
         
         print("\n" + "="*50)
         print("SEARCH COMPLETE!")
@@ -229,13 +360,13 @@ if __name__ == "__main__":
         # Print first 3 flights
         print("\nFirst 3 flights:")
         for flight in flights[:3]:
-            print(f"\nFlight {flight.get('index', 'N/A')}:")
-            if 'price' in flight:
-                print(f"  Price: {flight.get('price', 'N/A')}")
-                print(f"  Times: {flight.get('times', 'N/A')}")
+            print(f"\nFlight {flight.index or 'N/A'}:")
+            if flight.departure_time:
+                print(f"  Price: {flight.price}")
+                print(f"  Times: {flight.departure_time} - {flight.arrival_time}")
             else:
-                print(f"  {flight.get('price_text', 'N/A')}")
+                print(f"  {flight.raw_text or 'N/A'}")
     
     print("\n🔄 Press Enter to close browser...")
     input()
-    scraper.driver.quit()
\ No newline at end of file
+    scraper.close_driver()
\ No newline at end of file
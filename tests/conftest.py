@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The modules import each other by flat name, as when run as `python src/x.py`
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
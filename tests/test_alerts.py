@@ -0,0 +1,19 @@
+from alerts import AlertEngine
+from database import FlightDatabase
+from models import Flight
+
+
+def test_rules_added_by_another_process_apply_to_a_running_engine(tmp_path):
+    path = str(tmp_path / "f.db")
+    events = []
+    with FlightDatabase(path) as db:
+        AlertEngine(db, sinks=[events.append])
+        db.save_search("SNA", "EWR", [Flight(price_cents=15000)], departure_date="2026-12-01")
+
+        # e.g. `alerts.py add` while the scheduler is running
+        with FlightDatabase(path) as other:
+            AlertEngine(other, sinks=[]).add_rule("SNA", "EWR", max_price=120)
+
+        db.save_search("SNA", "EWR", [Flight(price_cents=11000)], departure_date="2026-12-01")
+
+    assert [(event["kind"], event["price_cents"]) for event in events] == [("below_threshold", 11000)]
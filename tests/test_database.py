@@ -0,0 +1,100 @@
+import sqlite3
+
+import pytest
+
+import database
+from database import MIGRATIONS, FlightDatabase
+from models import Flight
+
+# flights table as the first scraper versions created it, before any migration
+LEGACY_FLIGHTS = """
+    CREATE TABLE flights (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        search_id INTEGER NOT NULL,
+        price REAL,
+        airline TEXT,
+        departure_time TEXT,
+        arrival_time TEXT,
+        duration TEXT,
+        stops INTEGER,
+        flight_details TEXT,
+        raw_text TEXT
+    )
+"""
+
+
+def user_version(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def columns(path, table="flights"):
+    with sqlite3.connect(path) as conn:
+        return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    path = tmp_path / "legacy.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute(LEGACY_FLIGHTS)
+        conn.execute("""
+            INSERT INTO flights (search_id, price, airline, duration, stops, raw_text)
+            VALUES (1, '$1,204', 'Delta', '5 hr 30 min', '1 stop', 'Delta $1,204')
+        """)
+    return path
+
+
+def test_new_database_is_at_latest_version(tmp_path):
+    path = tmp_path / "new.db"
+    FlightDatabase(str(path)).close()
+    assert user_version(path) == len(MIGRATIONS)
+    assert {"price_cents", "raw_hash", "details_hash"} <= columns(path)
+
+
+def test_legacy_rows_are_normalized_and_texts_moved_to_blobs(legacy_db):
+    with FlightDatabase(str(legacy_db)) as db:
+        row = db.conn.execute(
+            "SELECT price, price_cents, currency, duration_minutes, stops, raw_text FROM flights"
+        ).fetchone()
+        assert row == (1204.0, 120400, "USD", 330, 1, None)
+        assert db.get_search_flights(1)[0].raw_text == "Delta $1,204"
+
+
+def test_failed_migration_rolls_back_and_can_be_retried(legacy_db, monkeypatch):
+    def fail(conn):
+        raise RuntimeError("migration step failed")
+
+    broken = [fail if step is database._normalize_legacy_flights else step for step in MIGRATIONS[1]]
+    monkeypatch.setattr(database, "MIGRATIONS", [MIGRATIONS[0], broken] + MIGRATIONS[2:])
+    with pytest.raises(RuntimeError):
+        FlightDatabase(str(legacy_db))
+    # Migration 2's ALTER TABLEs were undone along with the failed step
+    assert user_version(legacy_db) == 1
+    assert "price_cents" not in columns(legacy_db)
+
+    monkeypatch.undo()
+    FlightDatabase(str(legacy_db)).close()
+    assert user_version(legacy_db) == len(MIGRATIONS)
+
+
+def test_save_searches_keeps_given_search_date(tmp_path):
+    with FlightDatabase(str(tmp_path / "f.db")) as db:
+        search_id, = db.save_searches([{
+            "origin": "SNA",
+            "destination": "EWR",
+            "flights": [Flight(price_cents=10200, currency="USD")],
+            "search_date": "2025-10-01 03:44:19"
+        }])
+        assert db.conn.execute("SELECT search_date FROM flight_searches WHERE id = ?",
+                               (search_id,)).fetchone() == ("2025-10-01 03:44:19",)
+        assert db.get_price_history("SNA", "EWR", days=100000)[0][0] == "2025-10-01"
+
+
+def test_overnight_arrival_survives_a_round_trip(tmp_path):
+    with FlightDatabase(str(tmp_path / "f.db")) as db:
+        search_id = db.save_search("SNA", "EWR", [
+            Flight(price_cents=10200, departure_time="20:09", arrival_time="06:22", arrival_day_offset=1)
+        ])
+        flight, = db.get_search_flights(search_id)
+        assert (flight.departure_time, flight.arrival_time, flight.arrival_day_offset) == ("20:09", "06:22", 1)
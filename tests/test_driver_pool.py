@@ -0,0 +1,45 @@
+import pytest
+from urllib3.exceptions import MaxRetryError
+
+from driver_pool import DriverPool, driver_broken
+
+
+class DeadDriver:
+    """A driver whose chromedriver has exited: every command fails to connect"""
+
+    def __init__(self):
+        self.quit_called = False
+
+    @property
+    def window_handles(self):
+        raise MaxRetryError(None, "/session", "Connection refused")
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_release_discards_a_driver_that_cannot_be_reset():
+    pool = DriverPool(size=1)
+    driver = DeadDriver()
+    pool._created = 1
+
+    pool.release(driver)
+
+    assert driver.quit_called
+    assert pool._created == 0
+    assert pool._idle.empty()
+
+
+def test_acquire_times_out_instead_of_blocking_forever():
+    pool = DriverPool(size=1)
+    pool._created = 1
+
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.01)
+
+
+def test_only_parse_errors_leave_the_driver_reusable():
+    assert driver_broken(MaxRetryError(None, "/session", "Connection refused"))
+    assert driver_broken(ConnectionRefusedError())
+    assert not driver_broken(ValueError("Bad price"))
+    assert not driver_broken(None)
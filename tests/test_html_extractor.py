@@ -0,0 +1,70 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from html_extractor import PageSnapshot, SelectorSet, compile_selector
+
+FIXTURE_DIR = Path(__file__).resolve().parent.parent / "data" / "fixtures"
+
+PAGE = """
+<html><head><title>Results</title><style>.x{}</style></head><body>
+<ul role="list">
+  <li class="pIav2d card"><div>7:00 AM</div><div>United <span>$319</span></div></li>
+  <li class="pIav2d"><div>9:05 PM</div><div hidden>sponsored</div><div style="display: none">x</div></li>
+</ul>
+<div data-ved="1"><p>Price <b>$99</b></p></div>
+</body></html>
+"""
+
+
+@pytest.fixture
+def snapshot():
+    return PageSnapshot(PAGE)
+
+
+def test_text_renders_block_elements_as_lines_and_skips_hidden(snapshot):
+    first, second = snapshot.select("li[class*='pIav2d']")
+    assert first.text == "7:00 AM\nUnited $319"
+    assert second.text == "9:05 PM"
+
+
+def test_selectors(snapshot):
+    assert len(snapshot.select("ul[role='list'] > li")) == 2
+    assert len(snapshot.select("ul li.card")) == 1
+    assert len(snapshot.select("li[class^='pIav']")) == 2
+    assert len(snapshot.select("div[data-ved]")) == 1
+    assert [node.tag for node in snapshot.select("*:contains('$')")] == ["span", "b"]
+    # Child combinator: the span is not a direct child of the li
+    assert snapshot.select("li > span") == []
+
+
+def test_unsupported_selector_raises():
+    with pytest.raises(ValueError):
+        compile_selector("li:nth-child(2)")
+
+
+def test_first_match_honours_priority_and_accept(snapshot):
+    selectors = SelectorSet(["div[data-ved]", "li[class*='pIav2d']"])
+    assert snapshot.first_match(selectors)[0] == "div[data-ved]"
+    selector, nodes = snapshot.first_match(selectors, accept=lambda nodes: len(nodes) > 1)
+    assert selector == "li[class*='pIav2d']"
+    assert len(nodes) == 2
+
+
+def test_fixture_replays_to_its_hand_checked_goldens():
+    from working_flight_scraper import WorkingFlightScraper
+
+    with open(FIXTURE_DIR / "sna_ewr_2025-10-21.json", encoding="utf-8") as f:
+        fixture = json.load(f)
+    flights = WorkingFlightScraper().extract_flight_details(fixture["html"])
+
+    assert len(flights) == len(fixture["expected"]) == 10
+    # Checked by hand against the card texts, independently of parsing.py
+    assert [(f.departure_time, f.arrival_time, f.arrival_day_offset) for f in flights[:3]] == [
+        ("20:09", "06:22", 1), ("07:00", "15:29", 0), ("21:05", "05:16", 1)
+    ]
+    assert [f.duration_minutes for f in flights] == [433, 329, 311, 468, 480, 469, 422, 471, 432, 477]
+    assert [f.stops for f in flights] == [1, 0, 0, 1, 1, 1, 1, 1, 1, 1]
+    assert [f.price_cents for f in flights] == [10200, 31900, 31900] + [32900] * 7
+    assert {f.airline for f in flights[1:]} == {"United"}
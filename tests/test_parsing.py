@@ -0,0 +1,70 @@
+import pytest
+
+from parsing import CardParser, CarrierMatcher, parse_card, parse_duration, parse_price, parse_stops, parse_times
+
+# Card text as WebElement.text returns it (narrow no-break spaces before AM/PM)
+SPIRIT_CARD = ("8:09\u202fPM\n – \n6:22\u202fAM+1\nSpirit\n7 hr 13 min\nSNA–EWR\n1 stop\n"
+               "1 hr 2 min LAS\n335 kg CO2e\n+16% emissions\n0\n0\n$102\nround trip")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("$102", (10200, "USD")),
+    ("from $1,234.56 round trip", (123456, "USD")),
+    ("€ 89", (8900, "EUR")),
+    ("£45.10", (4510, "GBP")),
+    ("no fare", (None, None)),
+    (None, (None, None)),
+])
+def test_parse_price(text, expected):
+    assert parse_price(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("7 hr 13 min", 433),
+    ("8 hr", 480),
+    ("45 min", 45),
+    ("5h 30m", 330),
+    ("", None),
+])
+def test_parse_duration(text, expected):
+    assert parse_duration(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Nonstop", 0),
+    ("1 stop", 1),
+    ("2 stops", 2),
+    ("SNA–EWR", None),
+])
+def test_parse_stops(text, expected):
+    assert parse_stops(text) == expected
+
+
+def test_parse_times_converts_to_24_hour_with_day_offset():
+    assert parse_times(SPIRIT_CARD) == ("20:09", "06:22", 1)
+    assert parse_times("12:08 PM – 12:45 AM") == ("12:08", "00:45", 0)
+    assert parse_times("7:00 AM") == (None, None, 0)
+
+
+def test_parse_card_reads_every_field():
+    card = parse_card(SPIRIT_CARD)
+    assert card.price_cents == 10200
+    assert card.currency == "USD"
+    assert card.price_text == "$102"
+    assert (card.departure_time, card.arrival_time, card.arrival_day_offset) == ("20:09", "06:22", 1)
+    # The layover line ("1 hr 2 min LAS") must not replace the total duration
+    assert card.duration_minutes == 433
+    assert card.stops == 1
+    assert card.airline == "Spirit"
+
+
+def test_carrier_matcher_prefers_longest_name_and_whole_words():
+    matcher = CarrierMatcher(["Sun", "Sun Country"])
+    assert matcher.find("Sun Country 2 hr") == "Sun Country"
+    assert matcher.find("Sunday") is None
+
+
+def test_card_parser_uses_custom_carriers():
+    parser = CardParser(CarrierMatcher(["Porter"]))
+    assert parser.parse("Porter\n$150\nNonstop").airline == "Porter"
+    assert parser.parse(SPIRIT_CARD).airline is None
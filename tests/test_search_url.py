@@ -0,0 +1,36 @@
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from search_url import SEARCH_URL, build_search_url, encode_tfs
+
+# tfs of a round trip SNA→EWR 2025-10-21, back 2025-10-29, as Google Flights
+# itself put it in the results URL of data/fixtures/sna_ewr_2025-10-21.json
+CAPTURED_TFS = ("CBwQAhoeEgoyMDI1LTEwLTIxagcIARIDU05BcgcIARIDRVdSGh4SCjIwMjUtMTAtMjlqBwgBEgNFV1JyBwgBEgNTTkFA"
+                "AUgBcAGCAQsI____________AZgBAQ")
+
+
+def test_encode_tfs_matches_a_url_from_google_flights():
+    assert encode_tfs("SNA", "EWR", "2025-10-21", "2025-10-29") == CAPTURED_TFS
+
+
+def test_encode_tfs_upper_cases_airports():
+    assert encode_tfs("sna", "ewr", "2025-10-21", "2025-10-29") == CAPTURED_TFS
+
+
+def test_one_way_differs_from_round_trip():
+    assert encode_tfs("SNA", "EWR", "2025-10-21") != CAPTURED_TFS
+
+
+def test_build_search_url_query():
+    url = urlparse(build_search_url("SNA", "EWR", "2025-10-21", "2025-10-29", currency="EUR"))
+    assert f"{url.scheme}://{url.netloc}{url.path}" == SEARCH_URL
+    query = parse_qs(url.query)
+    assert query == {"tfs": [CAPTURED_TFS], "hl": ["en"], "curr": ["EUR"]}
+
+
+def test_invalid_searches_are_rejected():
+    with pytest.raises(ValueError):
+        encode_tfs("SNA", "EWR", "2025-10-21", cabin="steerage")
+    with pytest.raises(ValueError):
+        encode_tfs("SNA", "EWR", "2025-10-21", adults=0)